@@ -1,32 +1,88 @@
 """
 Flask Application Factory for ESG Impact Tracker
 """
+import os
+
+# Under gevent the stdlib (and psycopg2, which gevent cannot patch itself)
+# must be patched before flask_sqlalchemy or any database driver is imported
+if os.getenv('GEVENT_PATCH', '').lower() in ('true', '1', 'yes'):
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
 from flask import Flask, jsonify, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from config import DATABASE_URI
-import os
+from config import (
+    DEBUG, DATABASE_URI, SQLA_POOL_SIZE, SQLA_MAX_OVERFLOW, SQLA_POOL_TIMEOUT, SQLA_POOL_RECYCLE,
+    STATIC_MAX_AGE, PRELOAD_MODELS, LOG_LEVEL
+)
 
 # Initialize SQLAlchemy instance
 db = SQLAlchemy()
 
 
+def _engine_options(database_uri: str) -> dict:
+    """
+    Build SQLAlchemy engine options for the configured database.
+    
+    SQLite keeps Flask-SQLAlchemy's defaults (which already use a StaticPool
+    for in-memory databases); server databases get a pool sized for several
+    concurrent workers, with pre-ping and recycling to avoid stale connections
+    behind pgbouncer or server-side idle timeouts.
+    """
+    if database_uri.startswith('sqlite'):
+        return {}
+    
+    return {
+        'pool_size': SQLA_POOL_SIZE,
+        'max_overflow': SQLA_MAX_OVERFLOW,
+        'pool_timeout': SQLA_POOL_TIMEOUT,
+        'pool_pre_ping': True,
+        'pool_recycle': SQLA_POOL_RECYCLE
+    }
+
+
 def create_app():
     """
     Application factory pattern for Flask app.
     """
     app = Flask(__name__)
     
+    # Log through a background thread so pipeline progress messages don't
+    # serialize concurrent requests on stdout
+    from backend.utils.log_setup import configure_logging
+    configure_logging(LOG_LEVEL)
+    
+    # Use orjson for request/response JSON when available
+    from backend.utils.json_provider import ORJSONProvider, ORJSON_AVAILABLE, StructJSONProvider
+    app.json = ORJSONProvider(app) if ORJSON_AVAILABLE else StructJSONProvider(app)
+    
     # Enable CORS
     CORS(app)
     
     # Load configuration
     app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options(DATABASE_URI)
     
     # Initialize database with app
     db.init_app(app)
     
+    # Format the response timestamp once at the start of each request
+    from backend.utils.request_timestamp import install_request_timestamp
+    install_request_timestamp(app)
+    
+    # In development, count SQL queries per request to catch N+1 regressions
+    if DEBUG:
+        from backend.utils.query_counter import install_query_counter
+        with app.app_context():
+            install_query_counter(app, db.engine)
+    
     # Register blueprints
     from backend.routes.analyze import analyze_bp
     from backend.routes.alerts import alerts_bp
@@ -36,25 +92,40 @@ def create_app():
     app.register_blueprint(alerts_bp, url_prefix='/api/alerts')
     app.register_blueprint(ml_bp, url_prefix='/api/ml')
     
+    # Build the shared analyzer/pipeline now so the first request doesn't pay
+    # the model load (workers forked from a preloaded app share the weights)
+    if PRELOAD_MODELS:
+        from backend.services.nlp_pipeline import get_nlp_pipeline
+        get_nlp_pipeline().ml_analyzer.sentiment_analyzer  # Loaded lazily otherwise
+    
     # Health check route
     @app.route('/health', methods=['GET'])
     def health():
         return jsonify({"status": "ok"}), 200
     
-    # Serve frontend
+    # Serve frontend (in production, prefer serving these from nginx)
+    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
+    
     @app.route('/')
     def index():
-        frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
-        return send_from_directory(frontend_dir, 'index.html')
+        # Always revalidate the page so asset changes are picked up; the
+        # ETag lets unchanged copies come back as 304
+        response = send_from_directory(frontend_dir, 'index.html', max_age=0)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     
     @app.route('/<path:path>')
     def serve_static(path):
-        frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
-        return send_from_directory(frontend_dir, path)
+        # Asset names aren't content-hashed, so cache for a bounded window
+        # rather than marking them immutable
+        response = send_from_directory(frontend_dir, path, max_age=STATIC_MAX_AGE)
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+        return response
     
     return app
 
 
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn_config.py
     app = create_app()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=DEBUG, host='0.0.0.0', port=5000)
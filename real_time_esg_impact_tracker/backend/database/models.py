@@ -16,9 +16,10 @@ class Company(db.Model):
     industry = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationships
-    esg_scores = db.relationship('ESGScore', backref='company', lazy=True, cascade='all, delete-orphan')
-    alerts = db.relationship('Alert', backref='company', lazy=True, cascade='all, delete-orphan')
+    # Relationships (lazy='raise' so accidental per-row lazy loads fail loudly;
+    # load them explicitly with selectinload() where needed)
+    esg_scores = db.relationship('ESGScore', back_populates='company', lazy='raise', cascade='all, delete-orphan')
+    alerts = db.relationship('Alert', back_populates='company', lazy='raise', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Company {self.name}>'
@@ -51,6 +52,13 @@ class ESGScore(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    company = db.relationship('Company', back_populates='esg_scores', lazy='raise')
+    
+    # Supports latest-score-per-company lookups
+    __table_args__ = (
+        db.Index('ix_esg_company_created', 'company_id', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<ESGScore company_id={self.company_id} overall={self.overall_score}>'
     
@@ -78,9 +86,20 @@ class Alert(db.Model):
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
     message = db.Column(db.Text, nullable=False)
     severity = db.Column(db.String(20), default='info')  # info, warning, critical
-    is_resolved = db.Column(db.Boolean, default=False)
+    # server_default lets raw SQL inserts leave it out; default keeps ORM
+    # inserts correct on tables created before the server default existed
+    is_resolved = db.Column(db.Boolean, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    company = db.relationship('Company', back_populates='alerts', lazy='raise')
+    
+    # Cover the list/summary filters and the newest-first ordering
+    __table_args__ = (
+        db.Index('ix_alerts_company_created', 'company_id', 'created_at'),
+        db.Index('ix_alerts_severity_resolved', 'severity', 'is_resolved'),
+        db.Index('ix_alerts_created_desc', created_at.desc()),
+    )
+    
     def __repr__(self):
         return f'<Alert id={self.id} company_id={self.company_id}>'
     
@@ -94,3 +113,51 @@ class Alert(db.Model):
             'is_resolved': self.is_resolved,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+def upsert_company_id(name: str) -> int:
+    """
+    Get the id of the company with the given name, creating it if needed.
+    
+    Uses a single INSERT ... ON CONFLICT (name) ... RETURNING id on PostgreSQL
+    and SQLite, so concurrent callers can't race on the unique name
+    constraint. Other databases fall back to select-then-insert.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        company = Company.query.filter_by(name=name).first()
+        if not company:
+            company = Company(name=name)
+            db.session.add(company)
+            db.session.flush()
+        return company.id
+    
+    # The no-op update makes RETURNING yield the existing row on conflict
+    stmt = insert(Company).values(name=name).on_conflict_do_update(
+        index_elements=[Company.name],
+        set_={'name': name}
+    ).returning(Company.id)
+    return db.session.execute(stmt).scalar_one()
+
+
+def latest_scores_subquery():
+    """
+    Subquery holding each company's most recent ESG score row.
+    
+    Scores are ranked newest-first per company with ROW_NUMBER() so callers
+    can join companies to their latest score in a single query.
+    """
+    ranked_scores = db.select(
+        ESGScore.company_id, ESGScore.e_score, ESGScore.s_score,
+        ESGScore.g_score, ESGScore.overall_score, ESGScore.created_at,
+        db.func.row_number().over(
+            partition_by=ESGScore.company_id,
+            order_by=ESGScore.created_at.desc()
+        ).label('rn')
+    ).subquery()
+    
+    return db.select(ranked_scores).where(ranked_scores.c.rn == 1).subquery('latest_scores')
@@ -0,0 +1,88 @@
+"""
+Response serializers for read-only listings
+Encodes column-select rows straight to JSON without building ORM objects
+"""
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+if MSGSPEC_AVAILABLE:
+    class AlertOut(msgspec.Struct):
+        """Alert as returned by list endpoints (same fields as Alert.to_dict)"""
+        id: int
+        company_id: int
+        message: str
+        severity: Optional[str]
+        is_resolved: Optional[bool]
+        created_at: Optional[datetime]
+    
+    class ScoreHistoryOut(msgspec.Struct):
+        """ESG score as listed in a company's score history"""
+        date: datetime
+        e_score: Optional[float]
+        s_score: Optional[float]
+        g_score: Optional[float]
+        overall_score: Optional[float]
+    
+    _json_encoder = msgspec.json.Encoder()
+
+
+def alert_row_to_dict(row) -> dict:
+    """Convert an alert row from a column select to its API dictionary"""
+    alert = row._mapping
+    return {
+        'id': alert['id'],
+        'company_id': alert['company_id'],
+        'message': alert['message'],
+        'severity': alert['severity'],
+        'is_resolved': alert['is_resolved'],
+        'created_at': alert['created_at'].isoformat() if alert['created_at'] else None
+    }
+
+
+def encode_alert_rows(rows: Iterable) -> bytes:
+    """
+    Encode alert rows as a JSON array
+    
+    Args:
+        rows: Rows selecting the AlertOut columns
+        
+    Returns:
+        UTF-8 encoded JSON array
+    """
+    if MSGSPEC_AVAILABLE:
+        return _json_encoder.encode([AlertOut(**row._mapping) for row in rows])
+    return json.dumps([alert_row_to_dict(row) for row in rows], separators=(',', ':')).encode('utf-8')
+
+
+def score_history_to_dicts(rows: Iterable) -> List[Dict]:
+    """
+    Convert score history rows to API dictionaries
+    
+    Args:
+        rows: Rows selecting (created_at, e_score, s_score, g_score, overall_score)
+        
+    Returns:
+        List of {"date", "e_score", "s_score", "g_score", "overall_score"}
+        dictionaries with ISO-8601 dates
+    """
+    if MSGSPEC_AVAILABLE:
+        # msgspec builds the dicts and formats the dates in C
+        return msgspec.to_builtins([ScoreHistoryOut(*row) for row in rows])
+    return [
+        {
+            "date": created_at.isoformat(),
+            "e_score": e_score,
+            "s_score": s_score,
+            "g_score": g_score,
+            "overall_score": overall_score
+        }
+        for created_at, e_score, s_score, g_score, overall_score in rows
+    ]
@@ -2,15 +2,43 @@
 Alert Management Routes
 ML-powered alert detection and management endpoints
 """
-from flask import Blueprint, jsonify, request
-from backend.database.models import Alert, Company, ESGScore
+from flask import Blueprint, Response, current_app, g, jsonify, request, stream_with_context
+from backend.database.models import Alert, Company, latest_scores_subquery, upsert_company_id
+from backend.database.schemas import alert_row_to_dict, encode_alert_rows
 from backend.app import db
+from backend.utils.request_timestamp import request_timestamp
+from backend.utils.validation import validate_json
 from backend.services.ml_analyzer import get_ml_analyzer
 from backend.services.data_collector import get_data_collector
+from backend.services.job_queue import get_job_queue
+from backend.services.cache import ResultCache
+from backend.utils.coalesce import InflightCoalescer
 from datetime import datetime
 
 alerts_bp = Blueprint('alerts', __name__)
 
+# Concurrent /detect calls for the same company and threshold share one
+# collection + inference run. Waiters get no timeout of their own: a run can
+# outlast any fixed limit, and the owner's run already bounds the wait
+_detect_coalescer = InflightCoalescer(wait_timeout=None)
+
+# Columns read by alert endpoints, matching Alert.to_dict / AlertOut
+_ALERT_COLUMNS = (
+    Alert.id, Alert.company_id, Alert.message,
+    Alert.severity, Alert.is_resolved, Alert.created_at
+)
+
+# Summary counts are the same for every caller, so the response is cached
+# per process for a short window. Writes drop it in the worker that made
+# them; other workers may serve counts up to SUMMARY_CACHE_DURATION old
+SUMMARY_CACHE_DURATION = 15
+_summary_cache = ResultCache(ttl=SUMMARY_CACHE_DURATION, max_entries=1)
+
+
+def _invalidate_summary_cache():
+    """Drop this process's cached alert summary after alerts are written"""
+    _summary_cache.invalidate()
+
 
 @alerts_bp.route('/', methods=['GET'])
 def get_alerts():
@@ -30,24 +58,37 @@ def get_alerts():
         is_resolved = request.args.get('is_resolved')
         limit = request.args.get('limit', default=100, type=int)
         
-        # Build query
-        query = Alert.query
+        # Build query over plain columns; listings don't need ORM objects.
+        # lambda_stmt caches the construct and its compiled SQL per filter
+        # combination, with the filter values bound as parameters
+        stmt = db.lambda_stmt(lambda: db.select(*_ALERT_COLUMNS))
         
         if company_id:
-            query = query.filter_by(company_id=company_id)
+            stmt += lambda s: s.where(Alert.company_id == company_id)
         if severity:
-            query = query.filter_by(severity=severity)
+            stmt += lambda s: s.where(Alert.severity == severity)
         if is_resolved is not None:
             resolved_bool = is_resolved.lower() == 'true'
-            query = query.filter_by(is_resolved=resolved_bool)
+            stmt += lambda s: s.where(Alert.is_resolved == resolved_bool)
         
         # Order by most recent first
-        query = query.order_by(Alert.created_at.desc()).limit(limit)
-        
-        alerts = query.all()
+        stmt += lambda s: s.order_by(Alert.created_at.desc()).limit(limit)
         
-        # Return array directly for frontend compatibility
-        return jsonify([alert.to_dict() for alert in alerts]), 200
+        rows = db.session.execute(
+            stmt,
+            execution_options={'stream_results': True, 'yield_per': 200}
+        )
+        # Fetch the first partition here so query errors still get the JSON
+        # error response below; once streaming starts the status is sent
+        partitions = rows.partitions()
+        first_partition = next(partitions, [])
+        
+        # Return array directly for frontend compatibility, streamed in
+        # chunks so the full result is never held in memory at once
+        return Response(
+            stream_with_context(_stream_json_array(first_partition, partitions, encode_alert_rows)),
+            mimetype='application/json'
+        ), 200
         
     except Exception as e:
         return jsonify({
@@ -57,6 +98,7 @@ def get_alerts():
 
 
 @alerts_bp.route('/', methods=['POST'])
+@validate_json('company_id', 'message', error="company_id and message are required")
 def create_alert():
     """
     Create a new alert for a company.
@@ -68,10 +110,7 @@ def create_alert():
         "severity": "string (optional: info, warning, critical)"
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_id' not in data or 'message' not in data:
-        return jsonify({"error": "company_id and message are required"}), 400
+    data = g.payload
     
     try:
         company_id = data.get('company_id')
@@ -79,7 +118,7 @@ def create_alert():
         severity = data.get('severity', 'info')
         
         # Verify company exists
-        company = Company.query.get(company_id)
+        company = db.session.get(Company, company_id)
         if not company:
             return jsonify({"error": "Company not found"}), 404
         
@@ -87,12 +126,12 @@ def create_alert():
         alert = Alert(
             company_id=company_id,
             message=message,
-            severity=severity,
-            is_resolved=False
+            severity=severity
         )
         
         db.session.add(alert)
         db.session.commit()
+        _invalidate_summary_cache()
         
         return jsonify({
             "status": "created",
@@ -113,14 +152,16 @@ def get_alert(alert_id):
     Retrieve a specific alert by ID.
     """
     try:
-        alert = Alert.query.get(alert_id)
+        row = db.session.execute(
+            db.select(*_ALERT_COLUMNS).where(Alert.id == alert_id)
+        ).first()
         
-        if not alert:
+        if not row:
             return jsonify({"error": "Alert not found"}), 404
         
         return jsonify({
             "status": "success",
-            "alert": alert.to_dict()
+            "alert": alert_row_to_dict(row)
         }), 200
         
     except Exception as e:
@@ -142,23 +183,35 @@ def update_alert(alert_id):
     }
     """
     try:
-        alert = Alert.query.get(alert_id)
-        
-        if not alert:
+        data = request.get_json() or {}
+        changes = {field: data[field] for field in ('is_resolved', 'severity') if field in data}
+        
+        if changes:
+            # UPDATE ... RETURNING gives the response row in the same round
+            # trip, with no ORM load beforehand or refresh afterwards
+            row = db.session.execute(
+                db.update(Alert)
+                .where(Alert.id == alert_id)
+                .values(**changes)
+                .returning(*_ALERT_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).first()
+        else:
+            row = db.session.execute(
+                db.select(*_ALERT_COLUMNS).where(Alert.id == alert_id)
+            ).first()
+        
+        if not row:
+            db.session.rollback()
             return jsonify({"error": "Alert not found"}), 404
         
-        data = request.get_json()
-        
-        if 'is_resolved' in data:
-            alert.is_resolved = data['is_resolved']
-        if 'severity' in data:
-            alert.severity = data['severity']
-        
         db.session.commit()
+        if changes:
+            _invalidate_summary_cache()
         
         return jsonify({
             "status": "updated",
-            "alert": alert.to_dict()
+            "alert": alert_row_to_dict(row)
         }), 200
         
     except Exception as e:
@@ -175,13 +228,15 @@ def delete_alert(alert_id):
     Delete an alert
     """
     try:
-        alert = Alert.query.get(alert_id)
+        # Delete by primary key without loading the row (and its message text)
+        result = db.session.execute(db.delete(Alert).where(Alert.id == alert_id))
         
-        if not alert:
+        if result.rowcount == 0:
+            db.session.rollback()
             return jsonify({"error": "Alert not found"}), 404
         
-        db.session.delete(alert)
         db.session.commit()
+        _invalidate_summary_cache()
         
         return jsonify({
             "status": "deleted",
@@ -197,6 +252,7 @@ def delete_alert(alert_id):
 
 
 @alerts_bp.route('/detect', methods=['POST'])
+@validate_json('company_name')
 def detect_alerts():
     """
     Detect potential ESG alerts for a company using ML
@@ -205,63 +261,37 @@ def detect_alerts():
     {
         "company_name": "string (required)",
         "auto_create": bool (optional, default false),
-        "threshold": float (optional, 0-1, default 0.3)
+        "threshold": float (optional, 0-1, default 0.3),
+        "async": bool (optional, default false - queue the detection and
+                 return 202 with a job ID to poll at /detect/status/<job_id>)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     auto_create = data.get('auto_create', False)
     threshold = data.get('threshold', 0.3)
     
-    try:
-        # Collect recent data about the company
-        data_collector = get_data_collector()
-        collected_data = data_collector.collect_company_data(company_name, max_articles=30)
-        
-        # Aggregate text for analysis
-        texts = data_collector.aggregate_text_for_analysis(collected_data)
-        
-        # Detect risks using ML
-        ml_analyzer = get_ml_analyzer()
-        risks = ml_analyzer.detect_esg_risks(texts, threshold)
-        
-        # Auto-create alerts if requested
-        created_alerts = []
-        if auto_create and risks:
-            # Get or create company
-            company = Company.query.filter_by(name=company_name).first()
-            if not company:
-                company = Company(name=company_name)
-                db.session.add(company)
-                db.session.flush()
-            
-            # Create alerts for high and critical risks
-            for risk in risks:
-                if risk['severity'] in ['high', 'critical']:
-                    alert = Alert(
-                        company_id=company.id,
-                        message=f"[{risk['category'].upper()}] {risk['text'][:200]}",
-                        severity='critical' if risk['severity'] == 'critical' else 'warning',
-                        is_resolved=False
-                    )
-                    db.session.add(alert)
-                    created_alerts.append(alert)
-            
-            db.session.commit()
-        
+    if data.get('async', False):
+        app = current_app._get_current_object()
+        
+        def run_detection_job():
+            with app.app_context():
+                try:
+                    return _run_detection(company_name, auto_create, threshold)
+                except Exception:
+                    db.session.rollback()
+                    raise
+        
+        job_id = get_job_queue().submit(run_detection_job)
         return jsonify({
-            "status": "success",
-            "company_name": company_name,
-            "risks_detected": len(risks),
-            "risks": risks,
-            "alerts_created": len(created_alerts),
-            "created_alerts": [alert.to_dict() for alert in created_alerts] if created_alerts else [],
-            "timestamp": datetime.utcnow().isoformat()
-        }), 200
+            "status": "queued",
+            "job_id": job_id,
+            "status_url": f"/api/alerts/detect/status/{job_id}"
+        }), 202
+    
+    try:
+        return jsonify(_run_detection(company_name, auto_create, threshold)), 200
         
     except Exception as e:
         db.session.rollback()
@@ -271,7 +301,82 @@ def detect_alerts():
         }), 500
 
 
+@alerts_bp.route('/detect/status/<job_id>', methods=['GET'])
+def detect_status(job_id):
+    """
+    Get the state of a queued detection job, with its result once finished
+    """
+    job = get_job_queue().get_status(job_id)
+    
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(job), 200
+
+
+def _run_detection(company_name: str, auto_create: bool, threshold: float) -> dict:
+    """Detect risks for a company, optionally creating alerts, and build the response payload"""
+    risks = _detect_coalescer.run(
+        (company_name, round(float(threshold), 2)),
+        lambda: _detect_company_risks(company_name, threshold)
+    )
+    
+    # Auto-create alerts if requested
+    created_alerts = []
+    if auto_create and risks:
+        # Get or create company
+        company_id = upsert_company_id(company_name)
+        
+        # Create alerts for high and critical risks in one bulk INSERT
+        now = datetime.utcnow()
+        alert_rows = [
+            {
+                'company_id': company_id,
+                'message': f"[{risk['category'].upper()}] {risk['text'][:200]}",
+                'severity': 'critical' if risk['severity'] == 'critical' else 'warning',
+                'created_at': now
+            }
+            for risk in risks
+            if risk['severity'] in ('high', 'critical')
+        ]
+        if alert_rows:
+            # Serialize before commit expires the returned objects
+            created_alerts = [
+                alert.to_dict()
+                for alert in db.session.scalars(db.insert(Alert).returning(Alert), alert_rows)
+            ]
+        
+        db.session.commit()
+        if created_alerts:
+            _invalidate_summary_cache()
+    
+    return {
+        "status": "success",
+        "company_name": company_name,
+        "risks_detected": len(risks),
+        "risks": risks,
+        "alerts_created": len(created_alerts),
+        "created_alerts": created_alerts,
+        "timestamp": request_timestamp()
+    }
+
+
+def _detect_company_risks(company_name: str, threshold: float) -> list:
+    """Collect recent data about a company and run ML risk detection on it"""
+    # Collect recent data about the company
+    data_collector = get_data_collector()
+    collected_data = data_collector.collect_company_data(company_name, max_articles=30)
+    
+    # Aggregate text for analysis
+    texts = data_collector.aggregate_text_for_analysis(collected_data)
+    
+    # Detect risks using ML
+    ml_analyzer = get_ml_analyzer()
+    return ml_analyzer.detect_esg_risks(texts, threshold)
+
+
 @alerts_bp.route('/monitor', methods=['POST'])
+@validate_json('company_name')
 def monitor_company():
     """
     Set up continuous monitoring for a company
@@ -282,26 +387,20 @@ def monitor_company():
         "categories": ["environmental", "social", "governance"] (optional)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     categories = data.get('categories', ['environmental', 'social', 'governance'])
     
     try:
         # Get or create company
-        company = Company.query.filter_by(name=company_name).first()
-        if not company:
-            company = Company(name=company_name)
-            db.session.add(company)
-            db.session.commit()
+        company_id = upsert_company_id(company_name)
+        db.session.commit()
         
         return jsonify({
             "status": "success",
             "message": f"Monitoring enabled for {company_name}",
-            "company_id": company.id,
+            "company_id": company_id,
             "categories": categories,
             "note": "In production, this would set up background jobs for continuous monitoring"
         }), 200
@@ -318,33 +417,14 @@ def monitor_company():
 def get_alerts_summary():
     """
     Get summary statistics of alerts
+    
+    Counts may lag writes made through other server workers by up to
+    SUMMARY_CACHE_DURATION seconds.
     """
     try:
-        total_alerts = Alert.query.count()
-        unresolved_alerts = Alert.query.filter_by(is_resolved=False).count()
-        critical_alerts = Alert.query.filter_by(severity='critical', is_resolved=False).count()
-        warning_alerts = Alert.query.filter_by(severity='warning', is_resolved=False).count()
-        
-        # Get alerts by company
-        alerts_by_company = db.session.query(
-            Company.name,
-            db.func.count(Alert.id).label('alert_count')
-        ).join(Alert).group_by(Company.name).all()
-        
-        return jsonify({
-            "status": "success",
-            "summary": {
-                "total_alerts": total_alerts,
-                "unresolved_alerts": unresolved_alerts,
-                "critical_alerts": critical_alerts,
-                "warning_alerts": warning_alerts,
-                "alerts_by_company": [
-                    {"company_name": name, "count": count}
-                    for name, count in alerts_by_company
-                ]
-            },
-            "timestamp": datetime.utcnow().isoformat()
-        }), 200
+        # Concurrent requests on a cold cache share one computation
+        _, summary = _summary_cache.get_or_compute('summary', _compute_alerts_summary)
+        return jsonify(summary), 200
         
     except Exception as e:
         return jsonify({
@@ -353,37 +433,73 @@ def get_alerts_summary():
         }), 500
 
 
+def _compute_alerts_summary() -> dict:
+    """Build the /summary payload from the database"""
+    # Compute all headline counts in a single aggregate query
+    unresolved = Alert.is_resolved.is_(False)
+    total_alerts, unresolved_alerts, critical_alerts, warning_alerts = db.session.query(
+        db.func.count(Alert.id),
+        db.func.sum(db.case((unresolved, 1), else_=0)),
+        db.func.sum(db.case((db.and_(Alert.severity == 'critical', unresolved), 1), else_=0)),
+        db.func.sum(db.case((db.and_(Alert.severity == 'warning', unresolved), 1), else_=0))
+    ).one()
+    
+    # Get alerts by company
+    alerts_by_company = db.session.query(
+        Company.name,
+        db.func.count(Alert.id).label('alert_count')
+    ).join(Alert).group_by(Company.name).all()
+    
+    summary = {
+        "status": "success",
+        "summary": {
+            "total_alerts": total_alerts,
+            "unresolved_alerts": unresolved_alerts or 0,
+            "critical_alerts": critical_alerts or 0,
+            "warning_alerts": warning_alerts or 0,
+            "alerts_by_company": [
+                {"company_name": name, "count": count}
+                for name, count in alerts_by_company
+            ]
+        },
+        "timestamp": request_timestamp()
+    }
+    
+    return summary
+
+
 @alerts_bp.route('/companies', methods=['GET'])
 def get_companies():
     """
     Get all companies with their latest ESG scores
     """
     try:
-        companies = Company.query.all()
-        
-        result = []
-        for company in companies:
-            # Get latest ESG score for the company
-            latest_score = ESGScore.query.filter_by(company_id=company.id)\
-                .order_by(ESGScore.created_at.desc()).first()
-            
-            company_data = company.to_dict()
-            if latest_score:
-                company_data.update({
-                    'e_score': latest_score.e_score,
-                    's_score': latest_score.s_score,
-                    'g_score': latest_score.g_score,
-                    'overall_score': latest_score.overall_score
-                })
-            else:
-                company_data.update({
-                    'e_score': None,
-                    's_score': None,
-                    'g_score': None,
-                    'overall_score': None
-                })
-            
-            result.append(company_data)
+        # Join each company to its latest score in one query instead of
+        # one lookup per company
+        latest_scores = latest_scores_subquery()
+        
+        rows = db.session.execute(
+            db.select(
+                Company.id, Company.name, Company.industry, Company.created_at,
+                latest_scores.c.e_score, latest_scores.c.s_score,
+                latest_scores.c.g_score, latest_scores.c.overall_score
+            ).outerjoin(latest_scores, latest_scores.c.company_id == Company.id)
+        ).mappings()
+        
+        # Companies without scores get None from the outer join
+        result = [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'industry': row['industry'],
+                'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+                'e_score': row['e_score'],
+                's_score': row['s_score'],
+                'g_score': row['g_score'],
+                'overall_score': row['overall_score']
+            }
+            for row in rows
+        ]
         
         return jsonify(result), 200
         
@@ -392,3 +508,20 @@ def get_companies():
             "status": "error",
             "error": str(e)
         }), 500
+
+
+def _stream_json_array(first_partition, partitions, encode_rows):
+    """
+    Yield a JSON array from a streamed result, one chunk per fetched partition
+    
+    Args:
+        first_partition: Rows already fetched from the result
+        partitions: Iterator over the result's remaining partitions
+        encode_rows: Callable encoding a list of rows as a JSON array (bytes)
+    """
+    yield b'['
+    yield encode_rows(first_partition)[1:-1]
+    for partition in partitions:
+        # Splice each partition's array contents into the outer array
+        yield b',' + encode_rows(partition)[1:-1]
+    yield b']'
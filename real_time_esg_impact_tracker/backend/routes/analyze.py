@@ -2,17 +2,27 @@
 ESG Analysis Routes
 Machine Learning-powered ESG analysis endpoints
 """
-from flask import Blueprint, jsonify, request
+import logging
+
+from flask import Blueprint, Response, g, jsonify
 from backend.services.ollama_client import query_ollama
 from backend.services.nlp_pipeline import get_nlp_pipeline
 from backend.services.ml_analyzer import get_ml_analyzer
 from backend.services.data_collector import get_data_collector
-from backend.database.models import Company, ESGScore
+from backend.services.cache import content_key, get_result_cache
+from backend.database.models import ESGScore, upsert_company_id
 from backend.app import db
-from datetime import datetime
+from backend.utils.request_timestamp import request_timestamp
+from backend.utils.validation import validate_json
+from concurrent.futures import ThreadPoolExecutor
 
 analyze_bp = Blueprint('analyze', __name__)
 
+logger = logging.getLogger(__name__)
+
+# Runs the Ollama insight request alongside the NLP pipeline
+_ollama_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='esg-ollama')
+
 
 @analyze_bp.route('/', methods=['GET'])
 def index():
@@ -34,6 +44,7 @@ def index():
 
 
 @analyze_bp.route('/company', methods=['POST'])
+@validate_json('company_name')
 def analyze_company():
     """
     Analyze ESG metrics for a company using ML/NLP pipeline.
@@ -46,39 +57,45 @@ def analyze_company():
         "save_to_db": bool (optional, default true)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     max_articles = data.get('max_articles', 20)
     save_to_db = data.get('save_to_db', True)
     
     try:
-        # Use NLP pipeline for comprehensive analysis
+        cache = get_result_cache()
+        
+        # Optional: Get additional insights from Ollama if available. The
+        # request is independent of the NLP analysis, so start it first and
+        # let both run at the same time
+        prompt = f"Provide additional ESG insights for {company_name} based on recent performance"
+        ollama_future = _ollama_executor.submit(query_ollama, prompt)
+        
+        # Use NLP pipeline for comprehensive analysis; identical requests are
+        # served from the result cache
         pipeline = get_nlp_pipeline()
-        analysis_results = pipeline.analyze_company(company_name, max_articles)
+        cache_hit, analysis_results = pipeline.cached_analysis(company_name, max_articles)
         
-        # Save to database if requested
+        # Save to database if requested (drops this company's cached analyses,
+        # so re-cache the result just saved)
         if save_to_db:
             _save_analysis_to_db(company_name, analysis_results)
+            cache.set(pipeline.analysis_cache_key(company_name, max_articles), analysis_results)
         
-        # Optional: Get additional insights from Ollama if available
         ollama_insights = None
         try:
-            prompt = f"Provide additional ESG insights for {company_name} based on recent performance"
-            ollama_insights = query_ollama(prompt)
-        except Exception as e:
-            print(f"Ollama integration error: {e}")
+            ollama_insights = ollama_future.result()
+        except Exception:
+            logger.warning("Ollama integration error for %s", company_name, exc_info=True)
         
         return jsonify({
             "status": "success",
             "company_name": company_name,
             "analysis": analysis_results,
             "ollama_insights": ollama_insights,
-            "timestamp": datetime.utcnow().isoformat()
-        }), 200
+            "timestamp": request_timestamp()
+        }), 200, {'X-Cache': 'HIT' if cache_hit else 'MISS'}
         
     except Exception as e:
         return jsonify({
@@ -89,6 +106,7 @@ def analyze_company():
 
 
 @analyze_bp.route('/sentiment', methods=['POST'])
+@validate_json('text')
 def analyze_sentiment():
     """
     Analyze sentiment of provided text
@@ -98,23 +116,22 @@ def analyze_sentiment():
         "text": "string (required)"
     }
     """
-    data = request.get_json()
-    
-    if not data or 'text' not in data:
-        return jsonify({"error": "text is required"}), 400
+    data = g.payload
     
     text = data.get('text')
     
     try:
         ml_analyzer = get_ml_analyzer()
-        sentiment_result = ml_analyzer.analyze_sentiment(text)
+        cache_hit, sentiment_result = get_result_cache().get_or_compute(
+            ('sentiment', content_key(text)), lambda: ml_analyzer.analyze_sentiment_batched(text)
+        )
         
         return jsonify({
             "status": "success",
             "text": text[:100] + "..." if len(text) > 100 else text,
             "sentiment": sentiment_result,
-            "timestamp": datetime.utcnow().isoformat()
-        }), 200
+            "timestamp": request_timestamp()
+        }), 200, {'X-Cache': 'HIT' if cache_hit else 'MISS'}
         
     except Exception as e:
         return jsonify({
@@ -124,6 +141,7 @@ def analyze_sentiment():
 
 
 @analyze_bp.route('/category', methods=['POST'])
+@validate_json('text')
 def classify_category():
     """
     Classify text into ESG categories
@@ -133,23 +151,22 @@ def classify_category():
         "text": "string (required)"
     }
     """
-    data = request.get_json()
-    
-    if not data or 'text' not in data:
-        return jsonify({"error": "text is required"}), 400
+    data = g.payload
     
     text = data.get('text')
     
     try:
         ml_analyzer = get_ml_analyzer()
-        category_result = ml_analyzer.classify_esg_category(text)
+        cache_hit, category_result = get_result_cache().get_or_compute(
+            ('category', ml_analyzer.classifier_version, content_key(text)), lambda: ml_analyzer.classify_esg_category(text)
+        )
         
         return jsonify({
             "status": "success",
             "text": text[:100] + "..." if len(text) > 100 else text,
             "classification": category_result,
-            "timestamp": datetime.utcnow().isoformat()
-        }), 200
+            "timestamp": request_timestamp()
+        }), 200, {'X-Cache': 'HIT' if cache_hit else 'MISS'}
         
     except Exception as e:
         return jsonify({
@@ -159,6 +176,7 @@ def classify_category():
 
 
 @analyze_bp.route('/scores', methods=['POST'])
+@validate_json('texts', error="texts array is required", arrays={'texts': "texts must be an array"})
 def calculate_scores():
     """
     Calculate ESG scores from text data
@@ -170,21 +188,15 @@ def calculate_scores():
         "save_to_db": bool (optional, default false)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'texts' not in data:
-        return jsonify({"error": "texts array is required"}), 400
+    data = g.payload
     
     texts = data.get('texts')
     company_name = data.get('company_name')
     save_to_db = data.get('save_to_db', False)
     
-    if not isinstance(texts, list):
-        return jsonify({"error": "texts must be an array"}), 400
-    
     try:
         ml_analyzer = get_ml_analyzer()
-        scores = ml_analyzer.calculate_esg_scores(texts)
+        scores = ml_analyzer.calculate_esg_scores_batched(texts)
         
         # Save to database if requested and company name provided
         if save_to_db and company_name:
@@ -195,7 +207,7 @@ def calculate_scores():
             "company_name": company_name,
             "scores": scores,
             "texts_analyzed": len(texts),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
@@ -206,6 +218,7 @@ def calculate_scores():
 
 
 @analyze_bp.route('/compare', methods=['POST'])
+@validate_json('companies', error="companies array is required")
 def compare_companies():
     """
     Compare ESG performance across multiple companies
@@ -215,10 +228,7 @@ def compare_companies():
         "companies": ["string array (required, 2-5 companies)"]
     }
     """
-    data = request.get_json()
-    
-    if not data or 'companies' not in data:
-        return jsonify({"error": "companies array is required"}), 400
+    data = g.payload
     
     companies = data.get('companies')
     
@@ -235,7 +245,7 @@ def compare_companies():
         return jsonify({
             "status": "success",
             "comparison": comparison_results,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
@@ -246,6 +256,7 @@ def compare_companies():
 
 
 @analyze_bp.route('/report', methods=['POST'])
+@validate_json('company_name')
 def generate_report():
     """
     Generate comprehensive ESG report
@@ -256,27 +267,25 @@ def generate_report():
         "format": "string (optional: json, text, summary)"
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     format_type = data.get('format', 'json')
     
     try:
         pipeline = get_nlp_pipeline()
-        report = pipeline.generate_report(company_name, format_type)
+        _, analysis = pipeline.cached_analysis(company_name)
         
         if format_type in ['text', 'summary']:
-            return report, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+            # Send the report section by section instead of building it first
+            return Response(pipeline.iter_report(analysis, format_type), mimetype='text/plain')
         else:
             return jsonify({
                 "status": "success",
                 "company_name": company_name,
-                "report": report,
+                "report": ''.join(pipeline.iter_report(analysis, format_type)),
                 "format": format_type,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": request_timestamp()
             }), 200
         
     except Exception as e:
@@ -287,6 +296,7 @@ def generate_report():
 
 
 @analyze_bp.route('/aspect', methods=['POST'])
+@validate_json('company_name', 'aspect', error="company_name and aspect are required")
 def analyze_aspect():
     """
     Analyze specific ESG aspect
@@ -297,10 +307,7 @@ def analyze_aspect():
         "aspect": "string (required, e.g., 'carbon emissions', 'diversity')"
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data or 'aspect' not in data:
-        return jsonify({"error": "company_name and aspect are required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     aspect = data.get('aspect')
@@ -312,7 +319,7 @@ def analyze_aspect():
         return jsonify({
             "status": "success",
             "analysis": aspect_analysis,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
@@ -325,51 +332,44 @@ def analyze_aspect():
 def _save_analysis_to_db(company_name: str, analysis: dict):
     """Save analysis results to database"""
     try:
-        # Get or create company
-        company = Company.query.filter_by(name=company_name).first()
-        if not company:
-            company = Company(name=company_name)
-            db.session.add(company)
-            db.session.flush()
-        
-        # Save ESG scores
-        scores = analysis.get('esg_scores', {})
-        esg_score = ESGScore(
-            company_id=company.id,
-            e_score=scores.get('e_score'),
-            s_score=scores.get('s_score'),
-            g_score=scores.get('g_score'),
-            overall_score=scores.get('overall_score')
-        )
-        db.session.add(esg_score)
-        db.session.commit()
-        
-    except Exception as e:
+        _write_scores(company_name, analysis.get('esg_scores', {}))
+    except Exception:
         db.session.rollback()
-        print(f"Error saving to database: {e}")
+        logger.warning("Error saving analysis for %s to database", company_name, exc_info=True)
 
 
 def _save_scores_to_db(company_name: str, scores: dict):
     """Save ESG scores to database"""
     try:
-        # Get or create company
-        company = Company.query.filter_by(name=company_name).first()
-        if not company:
-            company = Company(name=company_name)
-            db.session.add(company)
-            db.session.flush()
-        
-        # Save ESG scores
-        esg_score = ESGScore(
-            company_id=company.id,
+        _write_scores(company_name, scores)
+    except Exception:
+        db.session.rollback()
+        logger.warning("Error saving scores for %s to database", company_name, exc_info=True)
+
+
+def _write_scores(company_name: str, scores: dict):
+    """
+    Insert a score row for the company (creating the company if needed)
+    
+    Both statements go out in one transaction with a single commit: an
+    upsert returning the company id, then a Core INSERT for the scores.
+    """
+    company_id = upsert_company_id(company_name)
+    db.session.execute(
+        db.insert(ESGScore).values(
+            company_id=company_id,
             e_score=scores.get('e_score'),
             s_score=scores.get('s_score'),
             g_score=scores.get('g_score'),
             overall_score=scores.get('overall_score')
         )
-        db.session.add(esg_score)
-        db.session.commit()
-        
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error saving scores to database: {e}")
+    )
+    db.session.commit()
+    _invalidate_company_analysis(company_name)
+
+
+def _invalidate_company_analysis(company_name: str):
+    """Drop cached analyses for a company after new scores are written"""
+    get_result_cache().invalidate(
+        lambda key: key[0] == 'analyze' and key[1] == company_name
+    )
@@ -2,15 +2,26 @@
 Additional ML Features Routes
 Advanced machine learning and data collection endpoints
 """
-from flask import Blueprint, jsonify, request
-from backend.services.data_collector import get_data_collector
+from flask import Blueprint, g, jsonify
+from backend.services.data_collector import get_data_collector, record_to_dict
 from backend.services.ml_analyzer import get_ml_analyzer
-from backend.database.models import Company, ESGScore
+from backend.services.cache import get_result_cache
+from backend.services.job_queue import get_job_queue
+from backend.database.models import Company, ESGScore, latest_scores_subquery
+from backend.database.schemas import score_history_to_dicts
 from backend.app import db
-from datetime import datetime
+from backend.utils.request_timestamp import request_timestamp
+from backend.utils.validation import validate_json
+from datetime import datetime, timedelta
+import numpy as np
 
 ml_bp = Blueprint('ml', __name__)
 
+SCORE_KEYS = ('e_score', 's_score', 'g_score', 'overall_score')
+
+# Upper bound on historical scores returned by /trends
+TRENDS_SCORE_LIMIT = 500
+
 
 @ml_bp.route('/', methods=['GET'])
 def index():
@@ -30,6 +41,7 @@ def index():
 
 
 @ml_bp.route('/collect', methods=['POST'])
+@validate_json('company_name')
 def collect_data():
     """
     Collect ESG data for a company from various sources
@@ -41,10 +53,7 @@ def collect_data():
         "include_content": bool (optional, default false)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     max_articles = data.get('max_articles', 20)
@@ -56,17 +65,24 @@ def collect_data():
         
         # Optionally fetch full content from URLs
         if include_content:
-            for article in collected_data.get('news_articles', [])[:5]:
-                url = article.get('url')
-                if url:
-                    content = collector.extract_text_from_url(url)
-                    article['full_content'] = content[:1000] if content else None
+            # Download the pages concurrently rather than one after another
+            news_articles = list(collected_data.get('news_articles', []))
+            with_url = [i for i, article in enumerate(news_articles[:5]) if article.url]
+            contents = collector.extract_texts_from_urls([news_articles[i].url for i in with_url])
+            for i, content in zip(with_url, contents):
+                news_articles[i] = dict(
+                    record_to_dict(news_articles[i]),
+                    full_content=content[:1000] if content else None
+                )
+            
+            # Copy rather than modify the collector's cached data
+            collected_data = dict(collected_data, news_articles=news_articles)
         
         return jsonify({
             "status": "success",
             "company_name": company_name,
             "collected_data": collected_data,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
@@ -77,73 +93,76 @@ def collect_data():
 
 
 @ml_bp.route('/train', methods=['POST'])
+@validate_json('training_data')
 def train_models():
     """
     Train or retrain ML models with custom data
     
+    Training runs in the background; the response is 202 with a job ID to
+    poll at /train/status/<job_id>.
+    
     Request body:
     {
         "training_data": [{"text": "string", "label": "string"}] (required),
-        "model_type": "string (classifier/sentiment)"
+        "model_type": "string (classifier/sentiment)",
+        "incremental": bool (optional, default false - update the current
+                       classifier instead of retraining from scratch)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'training_data' not in data:
-        return jsonify({"error": "training_data is required"}), 400
+    data = g.payload
     
     training_data = data.get('training_data')
     model_type = data.get('model_type', 'classifier')
+    incremental = data.get('incremental', False)
     
-    try:
-        # Extract texts and labels
-        texts = [item['text'] for item in training_data if 'text' in item]
-        labels = [item['label'] for item in training_data if 'label' in item]
-        
-        if len(texts) != len(labels):
-            return jsonify({"error": "Each training item must have 'text' and 'label'"}), 400
-        
-        # Train the model (simplified version)
-        ml_analyzer = get_ml_analyzer()
+    # Validate here: the job runs after this response is sent
+    if not isinstance(training_data, list) or not all(
+        isinstance(item, dict) and 'text' in item and 'label' in item for item in training_data
+    ):
+        return jsonify({"error": "Each training item must have 'text' and 'label'"}), 400
+    
+    # Extract texts and labels
+    texts = [item['text'] for item in training_data]
+    labels = [item['label'] for item in training_data]
+    
+    def run_training_job():
+        training_summary = {"training_samples": len(texts)}
         
         if model_type == 'classifier':
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.ensemble import RandomForestClassifier
-            import pickle
-            import os
-            
-            vectorizer = TfidfVectorizer(max_features=1000)
-            X = vectorizer.fit_transform(texts)
-            
-            classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-            classifier.fit(X, labels)
-            
-            # Save models
-            models_dir = ml_analyzer.models_dir
-            with open(os.path.join(models_dir, "esg_classifier.pkl"), 'wb') as f:
-                pickle.dump(classifier, f)
-            with open(os.path.join(models_dir, "vectorizer.pkl"), 'wb') as f:
-                pickle.dump(vectorizer, f)
-            
-            # Update analyzer's models
-            ml_analyzer.esg_classifier = classifier
-            ml_analyzer.vectorizer = vectorizer
+            training_summary = get_ml_analyzer().train_classifier(texts, labels, incremental)
+            # Cached classifications came from the previous model
+            get_result_cache().invalidate()
         
-        return jsonify({
+        return {
             "status": "success",
             "message": f"{model_type} model trained successfully",
-            "training_samples": len(texts),
-            "timestamp": datetime.utcnow().isoformat()
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "error": str(e)
-        }), 500
+            **training_summary,
+            "timestamp": request_timestamp()
+        }
+    
+    job_id = get_job_queue().submit(run_training_job)
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/api/ml/train/status/{job_id}"
+    }), 202
+
+
+@ml_bp.route('/train/status/<job_id>', methods=['GET'])
+def train_status(job_id):
+    """
+    Get the state of a queued training job, with its result once finished
+    """
+    job = get_job_queue().get_status(job_id)
+    
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(job), 200
 
 
 @ml_bp.route('/predict', methods=['POST'])
+@validate_json('texts', error="texts array is required", arrays={'texts': "texts must be an array"})
 def predict():
     """
     Make predictions using trained models
@@ -154,41 +173,37 @@ def predict():
         "prediction_type": "string (category/sentiment/scores)"
     }
     """
-    data = request.get_json()
-    
-    if not data or 'texts' not in data:
-        return jsonify({"error": "texts array is required"}), 400
+    data = g.payload
     
     texts = data.get('texts')
     prediction_type = data.get('prediction_type', 'category')
     
-    if not isinstance(texts, list):
-        return jsonify({"error": "texts must be an array"}), 400
-    
     try:
         ml_analyzer = get_ml_analyzer()
-        predictions = []
         
-        for text in texts:
-            if prediction_type == 'sentiment':
-                result = ml_analyzer.analyze_sentiment(text)
-            elif prediction_type == 'category':
-                result = ml_analyzer.classify_esg_category(text)
-            elif prediction_type == 'scores':
-                result = ml_analyzer.calculate_esg_scores([text])
-            else:
-                result = {"error": "Unknown prediction type"}
-            
-            predictions.append({
+        # Run the whole batch through the analyzer in one call
+        if prediction_type == 'sentiment':
+            results = ml_analyzer.analyze_sentiment_batch(texts)
+        elif prediction_type == 'category':
+            results = ml_analyzer.classify_esg_category_batch(texts)
+        elif prediction_type == 'scores':
+            results = ml_analyzer.calculate_esg_scores_batch([[text] for text in texts])
+        else:
+            results = [{"error": "Unknown prediction type"}] * len(texts)
+        
+        predictions = [
+            {
                 "text": text[:100],
                 "prediction": result
-            })
+            }
+            for text, result in zip(texts, results)
+        ]
         
         return jsonify({
             "status": "success",
             "prediction_type": prediction_type,
             "predictions": predictions,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
@@ -199,6 +214,7 @@ def predict():
 
 
 @ml_bp.route('/trends', methods=['POST'])
+@validate_json('company_name')
 def analyze_trends():
     """
     Analyze ESG trends for a company over time
@@ -206,37 +222,39 @@ def analyze_trends():
     Request body:
     {
         "company_name": "string (required)",
-        "days_back": int (optional, default 30)
+        "days_back": int (optional, default 30),
+        "limit": int (optional, default 500 - max historical scores returned)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     days_back = data.get('days_back', 30)
     
     try:
-        # Get historical data from database
-        company = Company.query.filter_by(name=company_name).first()
+        limit = int(data.get('limit', TRENDS_SCORE_LIMIT))
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    limit = min(limit, TRENDS_SCORE_LIMIT)
+    
+    try:
         
-        if company:
-            # Get historical scores
-            scores = ESGScore.query.filter_by(company_id=company.id).order_by(ESGScore.created_at.desc()).all()
-            
-            historical_scores = [
-                {
-                    "date": score.created_at.isoformat(),
-                    "e_score": score.e_score,
-                    "s_score": score.s_score,
-                    "g_score": score.g_score,
-                    "overall_score": score.overall_score
-                }
-                for score in scores
-            ]
-        else:
-            historical_scores = []
+        # Get the newest historical scores within the window from database in
+        # a single join query; the date filter and limit run in SQL
+        since = datetime.utcnow() - timedelta(days=days_back)
+        score_rows = db.session.execute(
+            db.select(
+                ESGScore.created_at, ESGScore.e_score, ESGScore.s_score,
+                ESGScore.g_score, ESGScore.overall_score
+            )
+            .join(Company, Company.id == ESGScore.company_id)
+            .where(Company.name == company_name, ESGScore.created_at >= since)
+            .order_by(ESGScore.created_at.desc())
+            .limit(limit)
+        )
+        historical_scores = score_history_to_dicts(score_rows)
         
         # Get recent news trends
         collector = get_data_collector()
@@ -244,16 +262,17 @@ def analyze_trends():
         
         # Analyze sentiment trends
         ml_analyzer = get_ml_analyzer()
-        news_texts = [f"{n.get('title', '')} {n.get('summary', '')}" for n in recent_news]
+        news_texts = [f"{n.title} {n.summary}" for n in recent_news]
         
-        sentiment_trend = []
-        if news_texts:
-            for text in news_texts[:20]:  # Limit analysis
-                sentiment = ml_analyzer.analyze_sentiment(text)
-                sentiment_trend.append({
-                    "score": sentiment.get('score', 0.5),
-                    "label": sentiment.get('label', 'neutral')
-                })
+        # One batched model call for the analyzed slice instead of one per text
+        sentiments = ml_analyzer.analyze_sentiment_batch(news_texts[:20]) if news_texts else []  # Limit analysis
+        sentiment_trend = [
+            {
+                "score": sentiment.get('score', 0.5),
+                "label": sentiment.get('label', 'neutral')
+            }
+            for sentiment in sentiments
+        ]
         
         # Calculate average sentiment
         avg_sentiment = sum(s['score'] for s in sentiment_trend) / len(sentiment_trend) if sentiment_trend else 0.5
@@ -268,7 +287,7 @@ def analyze_trends():
                 "average_sentiment": avg_sentiment,
                 "trend_direction": "positive" if avg_sentiment > 0.6 else "negative" if avg_sentiment < 0.4 else "neutral"
             },
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
@@ -279,6 +298,7 @@ def analyze_trends():
 
 
 @ml_bp.route('/benchmark', methods=['POST'])
+@validate_json('company_name')
 def benchmark_company():
     """
     Benchmark a company against industry averages
@@ -290,59 +310,46 @@ def benchmark_company():
         "peers": ["string array"] (optional)
     }
     """
-    data = request.get_json()
-    
-    if not data or 'company_name' not in data:
-        return jsonify({"error": "company_name is required"}), 400
+    data = g.payload
     
     company_name = data.get('company_name')
     industry = data.get('industry')
     peers = data.get('peers', [])
     
     try:
-        # Get company scores
-        company = Company.query.filter_by(name=company_name).first()
+        # Fetch the company and its peers with their latest scores in one query
+        latest_scores = latest_scores_subquery()
+        score_rows = db.session.execute(
+            db.select(Company.name, latest_scores.c.company_id, *(latest_scores.c[key] for key in SCORE_KEYS))
+            .outerjoin(latest_scores, latest_scores.c.company_id == Company.id)
+            .where(Company.name.in_([company_name] + list(peers)))
+        ).mappings()
+        rows_by_name = {row['name']: row for row in score_rows}
         
-        if not company:
+        if company_name not in rows_by_name:
             return jsonify({"error": "Company not found in database"}), 404
         
-        latest_score = ESGScore.query.filter_by(company_id=company.id).order_by(ESGScore.created_at.desc()).first()
+        latest_score = rows_by_name[company_name]
         
-        if not latest_score:
+        if latest_score['company_id'] is None:
             return jsonify({"error": "No ESG scores found for company"}), 404
         
-        company_scores = {
-            "e_score": latest_score.e_score,
-            "s_score": latest_score.s_score,
-            "g_score": latest_score.g_score,
-            "overall_score": latest_score.overall_score
-        }
+        company_scores = {key: latest_score[key] for key in SCORE_KEYS}
         
         # Calculate industry averages (from database or default)
+        industry_avg = {"e_score": 50, "s_score": 50, "g_score": 50, "overall_score": 50}
         if industry:
-            industry_companies = Company.query.filter_by(industry=industry).all()
-            industry_scores = []
-            for ic in industry_companies:
-                score = ESGScore.query.filter_by(company_id=ic.id).order_by(ESGScore.created_at.desc()).first()
-                if score:
-                    industry_scores.append({
-                        "e_score": score.e_score or 50,
-                        "s_score": score.s_score or 50,
-                        "g_score": score.g_score or 50,
-                        "overall_score": score.overall_score or 50
-                    })
+            industry_rows = db.session.execute(
+                db.select(*(latest_scores.c[key] for key in SCORE_KEYS))
+                .join(Company, Company.id == latest_scores.c.company_id)
+                .where(Company.industry == industry)
+            ).all()
             
-            if industry_scores:
-                industry_avg = {
-                    "e_score": sum(s["e_score"] for s in industry_scores) / len(industry_scores),
-                    "s_score": sum(s["s_score"] for s in industry_scores) / len(industry_scores),
-                    "g_score": sum(s["g_score"] for s in industry_scores) / len(industry_scores),
-                    "overall_score": sum(s["overall_score"] for s in industry_scores) / len(industry_scores)
-                }
-            else:
-                industry_avg = {"e_score": 50, "s_score": 50, "g_score": 50, "overall_score": 50}
-        else:
-            industry_avg = {"e_score": 50, "s_score": 50, "g_score": 50, "overall_score": 50}
+            if industry_rows:
+                # Missing (or zero) scores count as a neutral 50
+                industry_scores = np.array(industry_rows, dtype=float)
+                industry_scores[np.isnan(industry_scores) | (industry_scores == 0)] = 50
+                industry_avg = dict(zip(SCORE_KEYS, industry_scores.mean(axis=0).tolist()))
         
         # Calculate differences
         benchmark = {
@@ -356,29 +363,23 @@ def benchmark_company():
             }
         }
         
-        # Add peer comparison if peers provided
+        # Add peer comparison if peers provided (keeping the requested order)
         if peers:
-            peer_scores = []
-            for peer_name in peers:
-                peer = Company.query.filter_by(name=peer_name).first()
-                if peer:
-                    peer_score = ESGScore.query.filter_by(company_id=peer.id).order_by(ESGScore.created_at.desc()).first()
-                    if peer_score:
-                        peer_scores.append({
-                            "company_name": peer_name,
-                            "e_score": peer_score.e_score,
-                            "s_score": peer_score.s_score,
-                            "g_score": peer_score.g_score,
-                            "overall_score": peer_score.overall_score
-                        })
-            benchmark["peer_comparison"] = peer_scores
+            benchmark["peer_comparison"] = [
+                {
+                    "company_name": peer_name,
+                    **{key: rows_by_name[peer_name][key] for key in SCORE_KEYS}
+                }
+                for peer_name in peers
+                if peer_name in rows_by_name and rows_by_name[peer_name]['company_id'] is not None
+            ]
         
         return jsonify({
             "status": "success",
             "company_name": company_name,
             "industry": industry,
             "benchmark": benchmark,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": request_timestamp()
         }), 200
         
     except Exception as e:
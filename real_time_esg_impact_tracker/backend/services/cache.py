@@ -0,0 +1,220 @@
+"""
+Result Cache
+In-process TTL/LRU cache for expensive analysis results (NLP pipeline, Ollama, model inference)
+"""
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+from config import RESULT_CACHE_TTL, RESULT_CACHE_MAX_ENTRIES
+
+
+def content_key(text: str) -> str:
+    """
+    Build a compact cache key from arbitrary text content
+    
+    Args:
+        text: Text to hash (prompt, article text, etc.)
+    
+    Returns:
+        Hex digest identifying the text
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe cache with per-entry expiry and least-recently-used eviction
+    """
+    
+    def __init__(self, ttl: int = 3600, max_entries: int = 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            ttl: Seconds an entry stays valid (default: 1 hour)
+            max_entries: Maximum entries kept before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached value
+        
+        Returns:
+            (hit, value) tuple; value is None on a miss
+        """
+        with self._lock:
+            return self._lookup(key)
+    
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """get() without taking the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        
+        value, cached_at = entry
+        if time.time() - cached_at >= self.ttl:
+            del self._entries[key]
+            return False, None
+        
+        self._entries.move_to_end(key)
+        return True, value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_or_compute(self, key: Hashable, func: Callable[[], Any]) -> Tuple[bool, Any]:
+        """
+        Return the cached value for key, computing and storing it on a miss
+        
+        Concurrent misses for the same key share one call to func: the first
+        caller computes, the others wait for its value (and count as hits).
+        
+        Returns:
+            (hit, value) tuple
+        """
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                return True, value
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._inflight[key] = Future()
+        
+        if not is_owner:
+            return True, future.result()
+        
+        try:
+            value = func()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        
+        # Cached before the in-flight entry goes, so later callers hit it
+        self.set(key, value)
+        with self._lock:
+            del self._inflight[key]
+        future.set_result(value)
+        return False, value
+    
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """
+        Drop cached entries
+        
+        Args:
+            predicate: Called with each key; matching entries are dropped.
+                       Drops everything when omitted.
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+
+class DiskCache:
+    """
+    TTL cache persisted in a SQLite file, so entries outlive the process and
+    are shared by every worker using the same path
+    """
+    
+    def __init__(self, path: str, ttl: int = 86400):
+        """
+        Initialize the cache, creating the database file if needed
+        
+        Args:
+            path: SQLite database file
+            ttl: Seconds an entry stays valid (default: 1 day)
+        """
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as conn:
+            # WAL lets readers in other workers proceed while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, cached_at REAL)"
+            )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one operation, committing and closing it afterwards"""
+        # A connection per operation is cheap for SQLite and safe across
+        # threads and forked workers; sqlite3's own context manager only
+        # commits, so the connection is closed here
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        return content_key(repr(key))
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached value
+        
+        Returns:
+            (hit, value) tuple; value is None on a miss
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND cached_at > ?",
+                (self._key(key), time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, pickle.loads(row[0])
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, dropping expired entries"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, cached_at) VALUES (?, ?, ?)",
+                (self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now)
+            )
+            conn.execute("DELETE FROM entries WHERE cached_at <= ?", (now - self.ttl,))
+    
+    def invalidate(self):
+        """Drop all cached entries"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+
+# Global instance
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Get or create global result cache instance"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES)
+    return _result_cache
@@ -3,11 +3,29 @@ Data Collection Service for ESG Analysis
 Collects company news, reports, and ESG-related data from various sources
 """
 import requests
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import logging
 import re
+import calendar
 import time
-from urllib.parse import quote_plus
+from io import BytesIO
+import threading
+from functools import lru_cache
+from itertools import chain
+from email.utils import mktime_tz, parsedate_tz
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from urllib.parse import quote_plus, urlparse
+
+from backend.services.cache import DiskCache, ResultCache
+from backend.utils.keyword_matcher import build_keyword_matcher
+from backend.utils.rate_limit import RateLimiter
+from config import COLLECTION_CACHE_PATH
+
+logger = logging.getLogger(__name__)
 
 try:
     from bs4 import BeautifulSoup
@@ -17,47 +35,354 @@ except ImportError:
     BS4_AVAILABLE = False
     print("Warning: BeautifulSoup not available. Install requirements.txt for full functionality.")
 
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+
+# Collected items are immutable records: msgspec Structs when available
+# (compact, encoded in C), frozen dataclasses otherwise
+if MSGSPEC_AVAILABLE:
+    class _Record(msgspec.Struct, frozen=True):
+        """Base for collected items"""
+    
+    def _record(cls):
+        return cls
+    
+    record_to_dict = msgspec.structs.asdict
+else:
+    _Record = object
+    _record = dataclass(frozen=True)
+    record_to_dict = asdict
+
+
+@_record
+class Article(_Record):
+    """News article mentioning a company"""
+    title: str
+    summary: str
+    url: str
+    published: str
+    source: str
+    type: str
+
+
+@_record
+class ESGMention(Article):
+    """Article found by an ESG term search"""
+    esg_term: str
+
+
+@_record
+class TopicResult(Article):
+    """Article found by a specific ESG topic search"""
+    topic: str
+
+
+# Upper bound on the HTML downloaded per page for text extraction
+MAX_PAGE_BYTES = 512 * 1024
+
+# Major news RSS feeds
+NEWS_RSS_FEEDS = (
+    'http://feeds.reuters.com/reuters/businessNews',
+    'http://feeds.bbci.co.uk/news/business/rss.xml',
+    'https://www.ft.com/?format=rss',
+)
+
+# Google News search feed; query must already be URL-encoded
+GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+
+
+def _fast_parse_rss(content: bytes) -> List[Dict]:
+    """
+    Parse the items of an RSS 2.0 feed with lxml
+    
+    Args:
+        content: Raw feed bytes
+        
+    Returns:
+        Entry dictionaries with the feedparser keys used by the collector
+        (title, summary, link, published)
+    """
+    entries = []
+    for _, item in etree.iterparse(BytesIO(content), events=('end',), tag='item'):
+        entries.append({
+            'title': item.findtext('title', ''),
+            'summary': item.findtext('description', ''),
+            'link': item.findtext('link', ''),
+            'published': item.findtext('pubDate', '')
+        })
+        item.clear()
+    return entries
+
+
+def _published_timestamp(entry) -> Optional[float]:
+    """
+    Get a feed entry's publication time
+    
+    Args:
+        entry: Feed entry (feedparser or lxml parsed)
+        
+    Returns:
+        POSIX timestamp, or None when the entry has no parsable date
+    """
+    published_parsed = entry.get('published_parsed')
+    if published_parsed:
+        return calendar.timegm(published_parsed)
+    
+    parsed = parsedate_tz(entry.get('published') or '')
+    return mktime_tz(parsed) if parsed else None
+
+
+def _html_to_text(content: bytes) -> str:
+    """
+    Extract the visible text of an HTML page
+    
+    Args:
+        content: Raw HTML bytes
+        
+    Returns:
+        Page text with scripts and styles removed and whitespace collapsed
+    """
+    if SELECTOLAX_AVAILABLE:
+        # Parse and extract in C; much faster than BeautifulSoup's html.parser
+        tree = HTMLParser(content)
+        for node in tree.css('script, style'):
+            node.decompose()
+        text = tree.body.text(separator=' ', strip=True) if tree.body else ''
+    else:
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        text = soup.get_text(separator=' ')
+    
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=512)
+def _esg_report_searches(company_name: str) -> Tuple[Dict, ...]:
+    """
+    Build the ESG report search entries for a company (memoized)
+    
+    Args:
+        company_name: Name of the company
+        
+    Returns:
+        Report search dictionaries; treat as read-only
+    """
+    # Common ESG report patterns
+    report_searches = (
+        f"{company_name} sustainability report",
+        f"{company_name} ESG report",
+        f"{company_name} corporate social responsibility",
+    )
+    
+    # Simulated report search (in production, use actual ESG databases)
+    return tuple(
+        {
+            'title': f"{company_name} - ESG Report Search",
+            'search_term': search_term,
+            'type': 'report_search',
+            'note': 'Use dedicated ESG databases like Bloomberg ESG, MSCI ESG, or company IR pages for actual reports'
+        }
+        for search_term in report_searches
+    )
+
 
 class ESGDataCollector:
     """
     Collector for ESG-related data from various online sources
     """
     
-    def __init__(self, cache_duration: int = 3600):
+    def __init__(self, cache_duration: int = 3600, disk_cache_path: Optional[str] = None):
         """
         Initialize the data collector
         
         Args:
             cache_duration: Cache duration in seconds (default: 1 hour)
+            disk_cache_path: Optional SQLite file that also keeps collected
+                             company data for the rest of the UTC day
         """
         self.cache_duration = cache_duration
-        self.cache = {}
+        # Bounded: expired entries are dropped on access and the least
+        # recently used are evicted once 1024 companies are cached
+        self.cache = ResultCache(ttl=cache_duration, max_entries=1024)
+        self._disk_cache = DiskCache(disk_cache_path) if disk_cache_path else None
+        # Per-feed (etag, last_modified, entries) for conditional GETs
+        self._feed_meta = ResultCache(ttl=86400, max_entries=256)
+        # Extracted article text by (url, max_length); the same permalink
+        # often turns up under several feeds and ESG terms
+        self._page_cache = ResultCache(ttl=cache_duration, max_entries=2048)
+        # Concurrent feed fetches share one throttle for Google News
+        self._google_news_limiter = RateLimiter(rate=5, period=1.0)
         self.user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         
+        # Shared HTTP session so feed and article fetches reuse keep-alive
+        # connections to the same news hosts
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': self.user_agent})
+        
+        # Google News serves HTTP/2: with httpx, every concurrent feed query
+        # shares one multiplexed connection instead of one socket each
+        self._google_client = None
+        if HTTPX_AVAILABLE:
+            self._google_client = httpx.Client(
+                http2=True,
+                timeout=10,
+                follow_redirects=True,
+                headers={'User-Agent': self.user_agent},
+                transport=httpx.HTTPTransport(http2=True, retries=3)
+            )
+        
         # ESG-related search terms
         self.esg_terms = [
             'sustainability', 'ESG', 'environmental impact', 'social responsibility',
             'corporate governance', 'carbon emissions', 'diversity', 'ethics'
         ]
     
-    def collect_company_data(self, company_name: str, max_articles: int = 20) -> Dict:
+    def cache_clear(self):
+        """Drop all cached company data, topic searches, report searches, feeds and pages"""
+        self.cache.invalidate()
+        if self._disk_cache is not None:
+            self._disk_cache.invalidate()
+        self._feed_meta.invalidate()
+        self._page_cache.invalidate()
+        _esg_report_searches.cache_clear()
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+        if self._google_client is not None:
+            self._google_client.close()
+    
+    def __del__(self):
+        """Release pooled connections when the collector is discarded"""
+        for client in (getattr(self, 'session', None), getattr(self, '_google_client', None)):
+            if client is not None:
+                client.close()
+    
+    def collect_company_data(self, company_name: str, max_articles: int = 20,
+                             on_news: Optional[Callable[[List[Article]], None]] = None) -> Dict:
         """
         Collect comprehensive data about a company
         
         Args:
             company_name: Name of the company
             max_articles: Maximum number of articles to collect
+            on_news: Called with the news articles as soon as they are in,
+                     while the other sources are still being collected
+                     (not called when the data comes from the cache)
             
         Returns:
             Dictionary with collected data
         """
         # Check cache
-        cache_key = f"{company_name}_{max_articles}"
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_duration:
-                return cached_data
+        cache_hit, cached_data = self._get_cached(company_name, max_articles)
+        if cache_hit:
+            return cached_data
+        
+        return self._collect_and_cache(company_name, max_articles, on_news=on_news)
+    
+    def _get_cached(self, company_name: str, max_articles: int) -> Tuple[bool, Optional[Dict]]:
+        """Look up collected data in memory, then in the disk cache"""
+        cache_hit, cached_data = self.cache.get((company_name, max_articles))
+        if cache_hit or self._disk_cache is None:
+            return cache_hit, cached_data
+        
+        cache_hit, cached_data = self._disk_cache.get(self._disk_cache_key(company_name, max_articles))
+        if cache_hit:
+            self.cache.set((company_name, max_articles), cached_data)
+        return cache_hit, cached_data
+    
+    @staticmethod
+    def _disk_cache_key(company_name: str, max_articles: int) -> Tuple:
+        # Dated so persisted data is refetched once per UTC day at most
+        return (company_name, max_articles, datetime.now(timezone.utc).date().isoformat())
+    
+    def collect_many(self, companies: List[str], max_articles: int = 20) -> Dict[str, Dict]:
+        """
+        Collect data for a portfolio of companies
+        
+        The shared news feeds are downloaded once and every entry is matched
+        against all company names in a single pass, instead of once per company.
+        
+        Args:
+            companies: Company names
+            max_articles: Maximum number of articles per company
+            
+        Returns:
+            Dictionary mapping each company name to its collected data
+        """
+        results = {}
+        pending = []
+        
+        for company_name in dict.fromkeys(companies):
+            cache_hit, cached_data = self._get_cached(company_name, max_articles)
+            if cache_hit:
+                results[company_name] = cached_data
+            else:
+                pending.append(company_name)
+        
+        if pending:
+            rss_articles = self._collect_from_rss_many(pending, max_articles)
+            
+            with ThreadPoolExecutor(max_workers=min(4, len(pending))) as executor:
+                collected = executor.map(
+                    lambda company_name: self._collect_and_cache(
+                        company_name, max_articles, rss_articles[company_name]
+                    ),
+                    pending
+                )
+                results.update(zip(pending, collected))
+        
+        return {company_name: results[company_name] for company_name in dict.fromkeys(companies)}
+    
+    def _collect_and_cache(self, company_name: str, max_articles: int,
+                           rss_articles: Optional[List[Article]] = None,
+                           on_news: Optional[Callable[[List[Article]], None]] = None) -> Dict:
+        """
+        Collect data about a company and cache it
         
+        Args:
+            company_name: Name of the company
+            max_articles: Maximum number of articles to collect
+            rss_articles: Articles already matched from the shared RSS feeds
+            on_news: Called with the news articles before the ESG mentions are in
+            
+        Returns:
+            Dictionary with collected data
+        """
         collected_data = {
             'company_name': company_name,
             'timestamp': datetime.utcnow().isoformat(),
@@ -69,12 +394,16 @@ class ESGDataCollector:
         
         # Collect from various sources
         try:
-            # News articles via RSS feeds and APIs
-            news_data = self._collect_news_articles(company_name, max_articles)
-            collected_data['news_articles'].extend(news_data)
+            # News articles (RSS feeds and APIs) and ESG-specific mentions come
+            # from independent feeds, so collect both at the same time
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                esg_future = executor.submit(self._collect_esg_mentions, company_name)
+                news_data = self._collect_news_articles(company_name, max_articles, rss_articles)
+                if on_news is not None:
+                    on_news(news_data)
+                esg_data = esg_future.result()
             
-            # ESG-specific mentions
-            esg_data = self._collect_esg_mentions(company_name)
+            collected_data['news_articles'].extend(news_data)
             collected_data['esg_mentions'].extend(esg_data)
             
             # Public financial/ESG reports (if available)
@@ -83,105 +412,170 @@ class ESGDataCollector:
             
             # Add source tracking
             collected_data['sources'] = list(set([
-                item.get('source', 'unknown') 
+                item.source
                 for item in collected_data['news_articles'] + collected_data['esg_mentions']
             ]))
             
         except Exception as e:
-            print(f"Error collecting data for {company_name}: {e}")
+            logger.warning("Error collecting data for %s", company_name, exc_info=True)
             collected_data['error'] = str(e)
         
-        # Cache the results
-        self.cache[cache_key] = (collected_data, time.time())
+        # Cache the results (failed collections only in memory, so they are
+        # retried once it expires)
+        self.cache.set((company_name, max_articles), collected_data)
+        if self._disk_cache is not None and 'error' not in collected_data:
+            self._disk_cache.set(self._disk_cache_key(company_name, max_articles), collected_data)
         
         return collected_data
     
-    def _collect_news_articles(self, company_name: str, max_articles: int) -> List[Dict]:
+    def _collect_news_articles(self, company_name: str, max_articles: int,
+                               rss_articles: Optional[List[Article]] = None,
+                               since: Optional[float] = None) -> List[Article]:
         """
         Collect news articles about the company
         
         Args:
             company_name: Name of the company
             max_articles: Maximum number of articles
+            rss_articles: Articles already matched from the shared RSS feeds
+            since: Skip entries published before this POSIX timestamp
             
         Returns:
-            List of article dictionaries
+            List of articles
         """
         articles = []
         
-        # Try RSS feeds first (more reliable and doesn't require scraping)
-        rss_articles = self._collect_from_rss(company_name, max_articles)
-        articles.extend(rss_articles)
+        if rss_articles is not None:
+            # Matched from the shared feeds already; Google News is only
+            # fetched if they fall short
+            articles.extend(rss_articles)
+            if len(articles) < max_articles:
+                google_articles = self._collect_from_google_news_rss(company_name, max_articles, since)
+                articles.extend(google_articles[:max_articles - len(articles)])
+            return articles[:max_articles]
         
-        # If we need more articles, try Google News (via RSS)
-        if len(articles) < max_articles:
-            google_articles = self._collect_from_google_news_rss(company_name, max_articles - len(articles))
-            articles.extend(google_articles)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            # Start the Google News (via RSS) fallback right away so it
+            # downloads while the RSS feeds do; it is only used if needed
+            google_future = executor.submit(
+                self._collect_from_google_news_rss, company_name, max_articles, since
+            )
+            
+            # Try RSS feeds first (more reliable and doesn't require scraping)
+            articles.extend(self._collect_from_rss(company_name, max_articles, since))
+            
+            # If we need more articles, use Google News
+            if len(articles) < max_articles:
+                google_articles = google_future.result()[:max_articles - len(articles)]
+                articles.extend(google_articles)
+        finally:
+            # Don't wait for a fallback download that turned out not to be needed
+            executor.shutdown(wait=False)
         
         return articles[:max_articles]
     
-    def _collect_from_rss(self, company_name: str, max_items: int) -> List[Dict]:
+    def _collect_from_rss(self, company_name: str, max_items: int,
+                          since: Optional[float] = None) -> List[Article]:
         """
         Collect articles from RSS feeds
         
         Args:
             company_name: Name of the company
             max_items: Maximum items to collect
+            since: Skip entries published before this POSIX timestamp
             
         Returns:
-            List of article dictionaries
+            List of articles
         """
-        if not BS4_AVAILABLE:
-            return []
-        
-        articles = []
-        
-        # Major news RSS feeds
-        rss_feeds = [
-            'http://feeds.reuters.com/reuters/businessNews',
-            'http://feeds.bbci.co.uk/news/business/rss.xml',
-            'https://www.ft.com/?format=rss',
-        ]
+        return self._collect_from_rss_many([company_name], max_items, since)[company_name]
+    
+    def _collect_from_rss_many(self, company_names: List[str], max_items: int,
+                               since: Optional[float] = None) -> Dict[str, List[Article]]:
+        """
+        Collect articles mentioning any of several companies from RSS feeds
         
-        for feed_url in rss_feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:max_items]:
-                    # Check if company name is mentioned
-                    title = entry.get('title', '')
-                    summary = entry.get('summary', '')
-                    
-                    if company_name.lower() in title.lower() or company_name.lower() in summary.lower():
-                        articles.append({
-                            'title': title,
-                            'summary': summary,
-                            'url': entry.get('link', ''),
-                            'published': entry.get('published', ''),
-                            'source': feed_url,
-                            'type': 'news'
-                        })
-                        
-                        if len(articles) >= max_items:
-                            break
-            except Exception as e:
-                print(f"Error parsing RSS feed {feed_url}: {e}")
+        Args:
+            company_names: Names of the companies
+            max_items: Maximum items to collect per company
+            since: Skip entries published before this POSIX timestamp
+            
+        Returns:
+            Dictionary mapping each company name to its articles
+        """
+        articles = {company_name: [] for company_name in company_names}
+        if not BS4_AVAILABLE:
+            return articles
+        
+        # Names that casefold alike share their matches
+        names_by_needle = {}
+        for company_name in articles:
+            names_by_needle.setdefault(company_name.casefold(), []).append(company_name)
+        find_names = build_keyword_matcher(names_by_needle)
+        open_names = len(articles)
+        
+        # Download all feeds at once, then filter them in their listed order
+        for feed_url, entries in zip(NEWS_RSS_FEEDS, self._parse_feeds(list(NEWS_RSS_FEEDS))):
+            if isinstance(entries, Exception):
+                logger.warning("Error parsing RSS feed %s", feed_url, exc_info=entries)
                 continue
             
-            if len(articles) >= max_items:
+            for entry in entries[:max_items]:
+                # Dropping old entries first is cheaper than the name match
+                if since is not None:
+                    published_at = _published_timestamp(entry)
+                    if published_at is not None and published_at < since:
+                        continue
+                
+                # Check which company names are mentioned
+                title = entry.get('title', '')
+                summary = entry.get('summary', '')
+                
+                matched_needles = find_names(f"{title}\n{summary}".casefold())
+                if not matched_needles:
+                    continue
+                
+                # Immutable, so one record is shared by every matching company
+                article = Article(
+                    title=title,
+                    summary=summary,
+                    url=entry.get('link', ''),
+                    published=entry.get('published', ''),
+                    source=feed_url,
+                    type='news'
+                )
+                
+                for needle in matched_needles:
+                    for company_name in names_by_needle[needle]:
+                        company_articles = articles[company_name]
+                        if len(company_articles) >= max_items:
+                            continue
+                        
+                        company_articles.append(article)
+                        
+                        if len(company_articles) >= max_items:
+                            open_names -= 1
+                
+                if not open_names:
+                    break
+            
+            if not open_names:
                 break
         
         return articles
     
-    def _collect_from_google_news_rss(self, company_name: str, max_items: int) -> List[Dict]:
+    def _collect_from_google_news_rss(self, company_name: str, max_items: int,
+                                      since: Optional[float] = None) -> List[Article]:
         """
         Collect articles from Google News RSS
         
         Args:
             company_name: Name of the company
             max_items: Maximum items to collect
+            since: Skip entries published before this POSIX timestamp
             
         Returns:
-            List of article dictionaries
+            List of articles
         """
         if not BS4_AVAILABLE:
             return []
@@ -190,26 +584,28 @@ class ESGDataCollector:
         
         try:
             # Google News RSS URL
-            query = quote_plus(f"{company_name} ESG sustainability")
-            rss_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+            rss_url = GOOGLE_NEWS_RSS_URL.format(query=quote_plus(f"{company_name} ESG sustainability"))
             
-            feed = feedparser.parse(rss_url)
-            
-            for entry in feed.entries[:max_items]:
-                articles.append({
-                    'title': entry.get('title', ''),
-                    'summary': entry.get('summary', ''),
-                    'url': entry.get('link', ''),
-                    'published': entry.get('published', ''),
-                    'source': 'Google News',
-                    'type': 'news'
-                })
-        except Exception as e:
-            print(f"Error collecting from Google News: {e}")
+            for entry in self._fetch_feed_entries(rss_url)[:max_items]:
+                if since is not None:
+                    published_at = _published_timestamp(entry)
+                    if published_at is not None and published_at < since:
+                        continue
+                
+                articles.append(Article(
+                    title=entry.get('title', ''),
+                    summary=entry.get('summary', ''),
+                    url=entry.get('link', ''),
+                    published=entry.get('published', ''),
+                    source='Google News',
+                    type='news'
+                ))
+        except Exception:
+            logger.warning("Error collecting from Google News", exc_info=True)
         
         return articles
     
-    def _collect_esg_mentions(self, company_name: str) -> List[Dict]:
+    def _collect_esg_mentions(self, company_name: str) -> List[ESGMention]:
         """
         Collect ESG-specific mentions and reports
         
@@ -217,73 +613,138 @@ class ESGDataCollector:
             company_name: Name of the company
             
         Returns:
-            List of ESG mention dictionaries
+            List of ESG mentions
         """
         esg_mentions = []
         
-        # Search for ESG-specific news
-        for esg_term in self.esg_terms[:3]:  # Limit to avoid too many requests
-            try:
-                query = quote_plus(f"{company_name} {esg_term}")
-                rss_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-                
-                if BS4_AVAILABLE:
-                    feed = feedparser.parse(rss_url)
-                    
-                    for entry in feed.entries[:5]:  # Limit per term
-                        esg_mentions.append({
-                            'title': entry.get('title', ''),
-                            'summary': entry.get('summary', ''),
-                            'url': entry.get('link', ''),
-                            'published': entry.get('published', ''),
-                            'esg_term': esg_term,
-                            'source': 'Google News ESG',
-                            'type': 'esg_mention'
-                        })
-                
-                time.sleep(0.5)  # Rate limiting
-            except Exception as e:
-                print(f"Error collecting ESG mentions for term '{esg_term}': {e}")
+        if not BS4_AVAILABLE:
+            return esg_mentions
+        
+        # Search for ESG-specific news, one feed per term fetched concurrently
+        esg_terms = self.esg_terms[:3]  # Limit to avoid too many requests
+        company_query = quote_plus(company_name)
+        rss_urls = [
+            GOOGLE_NEWS_RSS_URL.format(query=f"{company_query}+{quote_plus(esg_term)}")
+            for esg_term in esg_terms
+        ]
+        
+        for esg_term, entries in zip(esg_terms, self._parse_feeds(rss_urls)):
+            if isinstance(entries, Exception):
+                logger.warning("Error collecting ESG mentions for term '%s'", esg_term, exc_info=entries)
                 continue
+            
+            for entry in entries[:5]:  # Limit per term
+                esg_mentions.append(ESGMention(
+                    title=entry.get('title', ''),
+                    summary=entry.get('summary', ''),
+                    url=entry.get('link', ''),
+                    published=entry.get('published', ''),
+                    source='Google News ESG',
+                    type='esg_mention',
+                    esg_term=esg_term
+                ))
         
         return esg_mentions
     
-    def _search_esg_reports(self, company_name: str) -> List[Dict]:
+    def _fetch_feed_entries(self, feed_url: str) -> List[Dict]:
         """
-        Search for ESG reports and sustainability documents
+        Download an RSS feed and parse its entries
         
         Args:
-            company_name: Name of the company
+            feed_url: Feed URL
             
         Returns:
-            List of report dictionaries
+            Feed entries (dict-like, keyed as in feedparser)
+        """
+        # Revalidate with the validators from the last download; an
+        # unchanged feed comes back as an empty 304
+        headers = {}
+        has_meta, meta = self._feed_meta.get(feed_url)
+        if has_meta:
+            etag, last_modified, cached_entries = meta
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        client = self.session
+        if urlparse(feed_url).netloc == 'news.google.com':
+            self._google_news_limiter.acquire()
+            if self._google_client is not None:
+                client = self._google_client
+        
+        # Download through the pooled client (with a timeout)
+        response = client.get(feed_url, headers=headers, timeout=10)
+        if response.status_code == 304 and has_meta:
+            return cached_entries
+        response.raise_for_status()
+        
+        entries = self._parse_feed_content(response.content)
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._feed_meta.set(feed_url, (etag, last_modified, entries))
+        
+        return entries
+    
+    def _parse_feed_content(self, content: bytes) -> List[Dict]:
         """
-        reports = []
+        Parse downloaded RSS feed bytes
         
-        # Common ESG report patterns
-        report_searches = [
-            f"{company_name} sustainability report",
-            f"{company_name} ESG report",
-            f"{company_name} corporate social responsibility",
-        ]
+        Args:
+            content: Raw feed bytes
+            
+        Returns:
+            Feed entries (dict-like, keyed as in feedparser)
+        """
+        if LXML_AVAILABLE:
+            # The RSS 2.0 feeds we read parse far faster in libxml2; anything
+            # else (Atom, malformed XML) still goes through feedparser
+            try:
+                entries = _fast_parse_rss(content)
+                if entries:
+                    return entries
+            except etree.XMLSyntaxError:
+                pass
         
-        for search_term in report_searches:
+        return feedparser.parse(content).entries
+    
+    def _parse_feeds(self, feed_urls: List[str], max_workers: int = 8) -> List:
+        """
+        Download and parse several RSS feeds concurrently
+        
+        Args:
+            feed_urls: Feed URLs to parse
+            max_workers: Maximum simultaneous downloads
+            
+        Returns:
+            Feed entries (or the exception raised) for each URL, in the same order
+        """
+        def parse(feed_url):
             try:
-                # Use a simple search approach (could be enhanced with actual API)
-                query = quote_plus(search_term)
-                
-                # Simulated report search (in production, use actual ESG databases)
-                reports.append({
-                    'title': f"{company_name} - ESG Report Search",
-                    'search_term': search_term,
-                    'type': 'report_search',
-                    'note': 'Use dedicated ESG databases like Bloomberg ESG, MSCI ESG, or company IR pages for actual reports'
-                })
+                return self._fetch_feed_entries(feed_url)
             except Exception as e:
-                print(f"Error searching reports: {e}")
-                continue
+                return e
+        
+        if not feed_urls:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(feed_urls))) as executor:
+            return list(executor.map(parse, feed_urls))
+    
+    def _search_esg_reports(self, company_name: str) -> List[Dict]:
+        """
+        Search for ESG reports and sustainability documents
         
-        return reports
+        Args:
+            company_name: Name of the company
+            
+        Returns:
+            List of report dictionaries
+        """
+        # Copy the memoized entries so callers can't modify the cached ones
+        return [dict(report) for report in _esg_report_searches(company_name)]
     
     def extract_text_from_url(self, url: str, max_length: int = 5000) -> Optional[str]:
         """
@@ -296,34 +757,60 @@ class ESGDataCollector:
         Returns:
             Extracted text or None
         """
-        if not BS4_AVAILABLE:
+        if not (SELECTOLAX_AVAILABLE or BS4_AVAILABLE):
             return None
         
+        cache_key = (url, max_length)
+        cache_hit, cached_text = self._page_cache.get(cache_key)
+        if cache_hit:
+            return cached_text
+        
         try:
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            # Stream the page and stop reading at MAX_PAGE_BYTES; only the
+            # first max_length characters of text are kept anyway
+            content = bytearray()
+            with self.session.get(url, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=16384):
+                    content.extend(chunk)
+                    if len(content) >= MAX_PAGE_BYTES:
+                        break
             
-            # Get text
-            text = soup.get_text()
+            text = _html_to_text(bytes(content))[:max_length]
             
-            # Clean up text
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text[:max_length]
-        except Exception as e:
-            print(f"Error extracting text from {url}: {e}")
+            # Failures are not cached so they are retried on the next call
+            self._page_cache.set(cache_key, text)
+            return text
+        except Exception:
+            logger.warning("Error extracting text from %s", url, exc_info=True)
             return None
     
-    def get_recent_company_news(self, company_name: str, days_back: int = 30) -> List[Dict]:
+    def extract_texts_from_urls(self, urls: List[str], max_length: int = 5000,
+                                max_workers: int = 5) -> List[Optional[str]]:
+        """
+        Extract text content from several URLs concurrently
+        
+        Args:
+            urls: URLs to extract from
+            max_length: Maximum text length to extract per URL
+            max_workers: Maximum simultaneous downloads
+            
+        Returns:
+            Extracted text (or None) for each URL, in the same order
+        """
+        if not urls:
+            return []
+        
+        # Download each distinct URL once, then fan the results back out
+        unique_urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as executor:
+            texts = dict(zip(
+                unique_urls,
+                executor.map(lambda url: self.extract_text_from_url(url, max_length), unique_urls)
+            ))
+        return [texts[url] for url in urls]
+    
+    def get_recent_company_news(self, company_name: str, days_back: int = 30) -> List[Article]:
         """
         Get recent news articles about a company
         
@@ -334,24 +821,12 @@ class ESGDataCollector:
         Returns:
             List of recent articles
         """
-        articles = self._collect_news_articles(company_name, max_articles=50)
-        
-        # Filter by date if possible
-        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-        recent_articles = []
-        
-        for article in articles:
-            try:
-                # Try to parse published date
-                published = article.get('published', '')
-                # This is a simplified check; enhance with proper date parsing
-                recent_articles.append(article)
-            except:
-                recent_articles.append(article)
-        
-        return recent_articles
+        # Entries older than the cutoff are dropped while the feeds are
+        # filtered; entries without a parsable date are kept
+        cutoff = time.time() - days_back * 86400
+        return self._collect_news_articles(company_name, max_articles=50, since=cutoff)
     
-    def search_specific_esg_topic(self, company_name: str, topic: str) -> List[Dict]:
+    def search_specific_esg_topic(self, company_name: str, topic: str) -> List[TopicResult]:
         """
         Search for specific ESG topic related to company
         
@@ -362,27 +837,32 @@ class ESGDataCollector:
         Returns:
             List of relevant articles/mentions
         """
+        # Repeated aspect analyses hit the same feed within seconds
+        cache_key = ('topic', company_name, topic)
+        cache_hit, cached_results = self.cache.get(cache_key)
+        if cache_hit:
+            return list(cached_results)
+        
         results = []
         
         try:
-            query = quote_plus(f"{company_name} {topic}")
-            rss_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+            rss_url = GOOGLE_NEWS_RSS_URL.format(query=quote_plus(f"{company_name} {topic}"))
             
             if BS4_AVAILABLE:
-                feed = feedparser.parse(rss_url)
+                for entry in self._fetch_feed_entries(rss_url)[:10]:
+                    results.append(TopicResult(
+                        title=entry.get('title', ''),
+                        summary=entry.get('summary', ''),
+                        url=entry.get('link', ''),
+                        published=entry.get('published', ''),
+                        source='Google News',
+                        type='topic_search',
+                        topic=topic
+                    ))
                 
-                for entry in feed.entries[:10]:
-                    results.append({
-                        'title': entry.get('title', ''),
-                        'summary': entry.get('summary', ''),
-                        'url': entry.get('link', ''),
-                        'published': entry.get('published', ''),
-                        'topic': topic,
-                        'source': 'Google News',
-                        'type': 'topic_search'
-                    })
-        except Exception as e:
-            print(f"Error searching for topic '{topic}': {e}")
+                self.cache.set(cache_key, tuple(results))
+        except Exception:
+            logger.warning("Error searching for topic '%s'", topic, exc_info=True)
         
         return results
     
@@ -396,39 +876,29 @@ class ESGDataCollector:
         Returns:
             List of text snippets for analysis
         """
-        texts = []
-        
-        # Extract from news articles
-        for article in collected_data.get('news_articles', []):
-            title = article.get('title', '')
-            summary = article.get('summary', '')
-            if title:
-                texts.append(title)
-            if summary:
-                texts.append(summary)
-        
-        # Extract from ESG mentions
-        for mention in collected_data.get('esg_mentions', []):
-            title = mention.get('title', '')
-            summary = mention.get('summary', '')
-            if title:
-                texts.append(title)
-            if summary:
-                texts.append(summary)
+        # Deduplicate in first-seen order so downstream batches are reproducible
+        texts = {}
         
-        # Remove duplicates and empty strings
-        texts = list(set([t.strip() for t in texts if t and t.strip()]))
+        for item in chain(collected_data.get('news_articles', []),
+                          collected_data.get('esg_mentions', [])):
+            for key in ('title', 'summary'):
+                text = (getattr(item, key) or '').strip()
+                if text:
+                    texts[text] = None
         
-        return texts
+        return list(texts)
 
 
 # Global instance
 _data_collector = None
+_data_collector_lock = threading.Lock()
 
 
 def get_data_collector() -> ESGDataCollector:
     """Get or create the global data collector instance"""
     global _data_collector
     if _data_collector is None:
-        _data_collector = ESGDataCollector()
+        with _data_collector_lock:
+            if _data_collector is None:
+                _data_collector = ESGDataCollector(disk_cache_path=COLLECTION_CACHE_PATH or None)
     return _data_collector
@@ -0,0 +1,106 @@
+"""
+Background Job Queue
+Runs long ML/data-collection work off the request thread and tracks its status
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from backend.services.cache import DiskCache, ResultCache
+from config import JOB_STORE_PATH
+
+
+class BackgroundJobQueue:
+    """
+    Job queue running jobs on an in-process thread pool
+    
+    Job status lives in a SQLite file when store_path is given, so any server
+    worker on the host can answer a status poll for a job another worker runs.
+    Without it, status is kept in this process only.
+    """
+    
+    def __init__(self, max_workers: int = 2, result_ttl: int = 3600, store_path: Optional[str] = None):
+        """
+        Initialize the job queue
+        
+        Args:
+            max_workers: Number of worker threads running jobs
+            result_ttl: Seconds a job record is kept after its last update (default: 1 hour)
+            store_path: SQLite file shared by worker processes for job status
+        """
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='esg-job')
+        # Both stores drop records result_ttl after they were last written
+        self._jobs = (
+            DiskCache(store_path, ttl=result_ttl) if store_path
+            else ResultCache(ttl=result_ttl, max_entries=10000)
+        )
+        self._lock = threading.Lock()
+    
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        Queue func(*args, **kwargs) to run in the background
+        
+        Returns:
+            Job ID to poll with get_status
+        """
+        job_id = uuid.uuid4().hex
+        self._jobs.set(job_id, {
+            'job_id': job_id,
+            'state': 'queued',
+            'submitted_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+            'result': None,
+            'error': None
+        })
+        
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+    
+    def get_status(self, job_id: str) -> Optional[Dict]:
+        """
+        Get the state of a job
+        
+        Returns:
+            Job status dictionary, or None if the job is unknown or expired
+        """
+        _, job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+    
+    def _run(self, job_id: str, func: Callable[..., Any], args: tuple, kwargs: dict):
+        """Execute a job and record its outcome"""
+        self._update(job_id, state='running')
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._update(job_id, state='failed', error=str(e))
+        else:
+            self._update(job_id, state='finished', result=result)
+    
+    def _update(self, job_id: str, **fields):
+        """Update a job record (only the thread running the job writes it)"""
+        with self._lock:
+            _, job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job = {**job, **fields}
+            if fields.get('state') in ('finished', 'failed'):
+                job['finished_at'] = datetime.utcnow().isoformat()
+            self._jobs.set(job_id, job)
+
+
+# Global instance
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> BackgroundJobQueue:
+    """Get or create the global background job queue"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = BackgroundJobQueue(store_path=JOB_STORE_PATH or None)
+    return _job_queue
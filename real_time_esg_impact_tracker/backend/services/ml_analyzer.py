@@ -2,44 +2,214 @@
 Machine Learning Service for ESG Analysis
 Provides sentiment analysis, text classification, and ESG scoring capabilities
 """
+import copy
 import re
+import threading
+import hashlib
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
-import pickle
 import os
+from collections import Counter
+from functools import cached_property
+
+from backend.services.cache import ResultCache, content_key
+from backend.utils.batching import DynamicBatcher
+from backend.utils.keyword_matcher import build_keyword_matcher
+from config import SENTIMENT_MODEL_DTYPE, SENTIMENT_ONNX_AUTO_EXPORT, SENTIMENT_TORCH_COMPILE, TORCH_NUM_THREADS
 
 try:
     from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
     import torch
     from textblob import TextBlob
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-    from sklearn.preprocessing import StandardScaler
     import nltk
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
     print("Warning: Some ML libraries not available. Install requirements.txt for full functionality.")
 
+# The category classifier only needs scikit-learn, so training works
+# without the transformer stack
+try:
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+    import joblib
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from optimum.exporters.onnx import main_export
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+if TRANSFORMERS_AVAILABLE and TORCH_NUM_THREADS:
+    torch.set_num_threads(TORCH_NUM_THREADS)
+
+# Sentiment pipelines keyed by models directory, shared across analyzer instances
+_sentiment_pipelines = {}
+_sentiment_pipelines_lock = threading.Lock()
+
+
+def _load_sentiment_pipeline(models_dir: str):
+    """
+    Load (once per models directory) the sentiment pipeline
+    
+    Args:
+        models_dir: Directory holding sentiment_onnx/ or sentiment_model/
+        
+    Returns:
+        Transformers pipeline, or None when only TextBlob is available
+    """
+    key = os.path.realpath(models_dir)
+    with _sentiment_pipelines_lock:
+        if key not in _sentiment_pipelines:
+            _sentiment_pipelines[key] = _build_sentiment_pipeline(models_dir)
+        return _sentiment_pipelines[key]
+
+
+def _build_sentiment_pipeline(models_dir: str):
+    """Build the best available sentiment pipeline for models_dir"""
+    if not TRANSFORMERS_AVAILABLE:
+        print("Transformers not available, using basic TextBlob for sentiment")
+        return None
+    
+    try:
+        # Prefer an int8 ONNX export (see export_to_onnx), then a
+        # fine-tuned sentiment model, then the default
+        onnx_dir = os.path.join(models_dir, "sentiment_onnx")
+        model_path = os.path.join(models_dir, "sentiment_model")
+        onnx_exists = os.path.exists(os.path.join(onnx_dir, "finbert.onnx"))
+        if ONNX_AVAILABLE and not onnx_exists and SENTIMENT_ONNX_AUTO_EXPORT:
+            # One-time export; every later load takes the ONNX branch below
+            source = model_path if os.path.exists(model_path) else "ProsusAI/finbert"
+            onnx_exists = _export_sentiment_onnx(models_dir, source) is not None
+        if ONNX_AVAILABLE and onnx_exists:
+            # ONNX Runtime models are already optimized and quantized
+            return pipeline(
+                "sentiment-analysis",
+                model=ORTModelForSequenceClassification.from_pretrained(onnx_dir, file_name="finbert.onnx"),
+                tokenizer=AutoTokenizer.from_pretrained(onnx_dir)
+            )
+        elif os.path.exists(model_path):
+            sentiment_pipeline = pipeline("sentiment-analysis", model=model_path)
+        else:
+            # Use pre-trained FinBERT for financial sentiment (good for ESG)
+            sentiment_pipeline = pipeline(
+                "sentiment-analysis",
+                model="ProsusAI/finbert",
+                tokenizer="ProsusAI/finbert"
+            )
+    except Exception as e:
+        print(f"Could not load transformer model: {e}. Using TextBlob fallback.")
+        return None
+    
+    _optimize_sentiment_pipeline(sentiment_pipeline)
+    return sentiment_pipeline
+
+
+def _export_sentiment_onnx(models_dir: str, model_name: str) -> Optional[str]:
+    """Export model_name to models_dir/sentiment_onnx as int8 ONNX (see ESGMLAnalyzer.export_to_onnx)"""
+    if not ONNX_AVAILABLE:
+        print("ONNX export requires optimum[onnxruntime]")
+        return None
+    
+    onnx_dir = os.path.join(models_dir, "sentiment_onnx")
+    try:
+        # Writes model.onnx plus the config and tokenizer files
+        main_export(model_name, output=onnx_dir, task="text-classification")
+        
+        fp32_path = os.path.join(onnx_dir, "model.onnx")
+        quantize_dynamic(fp32_path, os.path.join(onnx_dir, "finbert.onnx"), weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+    except Exception as e:
+        print(f"Error exporting sentiment model to ONNX: {e}")
+        return None
+    
+    return onnx_dir
+
+
+def _optimize_sentiment_pipeline(sentiment_pipeline):
+    """Apply the configured precision and torch.compile to a sentiment pipeline's model"""
+    model = sentiment_pipeline.model
+    dtype_name = SENTIMENT_MODEL_DTYPE.lower()
+    if dtype_name == 'auto':
+        dtype_name = 'float16' if model.device.type == 'cuda' else 'float32'
+    
+    if dtype_name == 'float32' and not SENTIMENT_TORCH_COMPILE:
+        return
+    
+    try:
+        optimized = model
+        if dtype_name != 'float32':
+            optimized = optimized.to(dtype=getattr(torch, dtype_name))
+        if SENTIMENT_TORCH_COMPILE:
+            optimized = torch.compile(optimized, mode="reduce-overhead")
+        sentiment_pipeline.model = optimized
+        
+        # Warm up once so compilation happens now rather than on the
+        # first request, and so an unsupported setup is caught here
+        with torch.inference_mode():
+            sentiment_pipeline(["Quarterly sustainability report published"], truncation=True)
+    except Exception as e:
+        print(f"Could not optimize sentiment model ({dtype_name}): {e}. Using float32.")
+        sentiment_pipeline.model = model.to(dtype=torch.float32)
+
+# Row order of the per-category score arrays and each category's share of the overall score
+_SCORE_CATEGORIES = {'environmental': 0, 'social': 1, 'governance': 2}
+_OVERALL_WEIGHTS = np.array([0.35, 0.35, 0.30])
+
+# Score requests with this many texts skip the dynamic batcher
+_BATCHED_SCORE_MAX_TEXTS = 32
+
+# Risks are listed most severe first
+_SEVERITY_RANK = {'critical': 3, 'high': 2, 'medium': 1, 'low': 0}
+
 
 class ESGMLAnalyzer:
     """
     Machine Learning analyzer for ESG (Environmental, Social, Governance) metrics
     """
     
-    def __init__(self, models_dir: str = "models"):
+    def __init__(self, models_dir: str = "models", risk_cache_duration: int = 60):
         """
         Initialize the ML analyzer
         
         Args:
             models_dir: Directory to store/load trained models
+            risk_cache_duration: Risk detection cache duration in seconds (default: 60)
         """
         self.models_dir = models_dir
         os.makedirs(models_dir, exist_ok=True)
         
-        # Initialize components
-        self.sentiment_analyzer = None
+        # Risk detection results keyed by content hash
+        self.risk_cache_duration = risk_cache_duration
+        self._risk_cache = ResultCache(ttl=risk_cache_duration, max_entries=256)
+        
+        # Per-text model outputs keyed by content hash
+        self._sentiment_cache = ResultCache(max_entries=4096)
+        self._category_cache = ResultCache(max_entries=4096)
+        self._classifier_version = 0
+        
+        # Modification time of the classifier file the current models match,
+        # so a model trained by another worker process is picked up
+        self._model_mtime = None
+        self._model_lock = threading.Lock()
+        
+        # Single-text calls from concurrent requests share one model pass
+        self._sentiment_batcher = DynamicBatcher(
+            self.analyze_sentiment_batch, max_batch_size=32, max_wait=0.05, workers=2
+        )
+        self._score_batcher = DynamicBatcher(
+            self.calculate_esg_scores_batch, max_batch_size=32, max_wait=0.05, workers=2
+        )
+        
+        # Initialize components (the sentiment model loads on first use)
         self.esg_classifier = None
         self.score_predictor = None
         self.vectorizer = None
@@ -67,58 +237,149 @@ class ESGMLAnalyzer:
             ]
         }
         
+        # Risk keywords
+        self.risk_keywords = {
+            'environmental': ['pollution', 'spill', 'contamination', 'violation', 'fine', 'lawsuit'],
+            'social': ['discrimination', 'harassment', 'violation', 'lawsuit', 'strike', 'accident'],
+            'governance': ['fraud', 'corruption', 'scandal', 'investigation', 'lawsuit', 'breach']
+        }
+        self._critical_keywords = frozenset({'fraud', 'corruption', 'lawsuit', 'investigation', 'spill'})
+        
+        # Each text is scanned once for all keywords instead of once per keyword
+        self._keyword_categories = {}
+        for category, keywords in self.esg_keywords.items():
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword, []).append(category)
+        self._find_esg_keywords = build_keyword_matcher(self._keyword_categories)
+        self._find_risk_keywords = build_keyword_matcher(
+            keyword for keywords in self.risk_keywords.values() for keyword in keywords
+        )
+        
         # Load or initialize models
         self._initialize_models()
     
+    @cached_property
+    def sentiment_analyzer(self):
+        """Transformer sentiment pipeline, loaded on first use and shared by analyzers using the same models_dir"""
+        return _load_sentiment_pipeline(self.models_dir)
+    
     def _initialize_models(self):
         """Initialize or load pre-trained models"""
         if not TRANSFORMERS_AVAILABLE:
-            print("Transformers not available, using basic TextBlob for sentiment")
             return
         
-        try:
-            # Try to load fine-tuned sentiment model or use default
-            model_path = os.path.join(self.models_dir, "sentiment_model")
-            if os.path.exists(model_path):
-                self.sentiment_analyzer = pipeline("sentiment-analysis", model=model_path)
-            else:
-                # Use pre-trained FinBERT for financial sentiment (good for ESG)
-                self.sentiment_analyzer = pipeline(
-                    "sentiment-analysis",
-                    model="ProsusAI/finbert",
-                    tokenizer="ProsusAI/finbert"
-                )
-        except Exception as e:
-            print(f"Could not load transformer model: {e}. Using TextBlob fallback.")
-            self.sentiment_analyzer = None
-        
         # Load custom ESG classifier if exists
-        classifier_path = os.path.join(self.models_dir, "esg_classifier.pkl")
-        vectorizer_path = os.path.join(self.models_dir, "vectorizer.pkl")
+        classifier_path = os.path.join(self.models_dir, "esg_classifier.joblib")
+        vectorizer_path = os.path.join(self.models_dir, "vectorizer.joblib")
+        mmap_mode = 'r'
+        if not (os.path.exists(classifier_path) and os.path.exists(vectorizer_path)):
+            # Models saved by older versions are compressed pickles, which
+            # joblib loads fine but cannot memory-map
+            classifier_path = os.path.join(self.models_dir, "esg_classifier.pkl")
+            vectorizer_path = os.path.join(self.models_dir, "vectorizer.pkl")
+            mmap_mode = None
         
         if os.path.exists(classifier_path) and os.path.exists(vectorizer_path):
             try:
-                with open(classifier_path, 'rb') as f:
-                    self.esg_classifier = pickle.load(f)
-                with open(vectorizer_path, 'rb') as f:
-                    self.vectorizer = pickle.load(f)
+                # Memory-mapped weights are shared through the page cache by
+                # every worker process instead of being copied into each one
+                self.esg_classifier = joblib.load(classifier_path, mmap_mode=mmap_mode)
+                self.vectorizer = joblib.load(vectorizer_path, mmap_mode=mmap_mode)
+                if mmap_mode:
+                    self._model_mtime = self._stored_model_mtime()
             except Exception as e:
                 print(f"Error loading classifier: {e}")
                 self._create_default_classifier()
         else:
             self._create_default_classifier()
     
+    @property
+    def classifier_version(self) -> int:
+        """Version of the category classifier, changing whenever it is retrained (include it in cache keys of classifier output)"""
+        self._refresh_classifier()
+        return self._classifier_version
+    
+    def _stored_model_mtime(self) -> Optional[int]:
+        """Modification time of the saved classifier, or None if there is none"""
+        try:
+            return os.stat(os.path.join(self.models_dir, "esg_classifier.joblib")).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _refresh_classifier(self):
+        """Load the saved classifier if another process retrained it since it was loaded here"""
+        if not SKLEARN_AVAILABLE:
+            return
+        
+        # A stat per call is cheap next to classification
+        mtime = self._stored_model_mtime()
+        if mtime is None or mtime == self._model_mtime:
+            return
+        
+        with self._model_lock:
+            if mtime == self._model_mtime:
+                return
+            try:
+                # The vectorizer is saved first, so it already matches the classifier
+                vectorizer = joblib.load(os.path.join(self.models_dir, "vectorizer.joblib"), mmap_mode='r')
+                classifier = joblib.load(os.path.join(self.models_dir, "esg_classifier.joblib"), mmap_mode='r')
+            except Exception as e:
+                print(f"Error reloading classifier: {e}")
+                return
+            
+            self._model_mtime = mtime
+            self._swap_classifier(vectorizer, classifier)
+    
+    def _swap_classifier(self, vectorizer, classifier):
+        """Swap in new category models and drop results computed with the old ones"""
+        self.esg_classifier = classifier
+        self.vectorizer = vectorizer
+        self._classifier_version += 1
+        self._category_cache.invalidate()
+        self._risk_cache.invalidate()
+    
+    def export_to_onnx(self, model_name: str = "ProsusAI/finbert") -> Optional[str]:
+        """
+        Export the sentiment model to ONNX with int8 dynamic quantization
+        
+        The export is picked up the next time the analyzer loads its models
+        and runs much faster than the PyTorch model on CPU.
+        
+        Args:
+            model_name: Hugging Face model name or local path to export
+            
+        Returns:
+            Directory holding the export, or None if it failed
+        """
+        return _export_sentiment_onnx(self.models_dir, model_name)
+    
+    def _new_classifier_models(self):
+        """
+        Create an untrained vectorizer/classifier pair
+        
+        HashingVectorizer keeps no vocabulary, so it needs no fitting pass and
+        stays valid as new training data arrives; the logistic-loss SGD
+        classifier supports predict_proba and incremental partial_fit.
+        Features are float32, so the classifier's weights are learned (and
+        saved) as float32 too - half the memory and file size of float64.
+        """
+        vectorizer = HashingVectorizer(
+            n_features=2 ** 18, ngram_range=(1, 2), alternate_sign=False, norm='l2',
+            dtype=np.float32
+        )
+        classifier = SGDClassifier(loss='log_loss', random_state=42, n_jobs=-1)
+        return vectorizer, classifier
+    
     def _create_default_classifier(self):
         """Create a default ESG classifier with sample training"""
-        self.vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))
-        self.esg_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.vectorizer, self.esg_classifier = self._new_classifier_models()
         
         # Sample training data (in production, use real labeled data)
         training_texts = self._get_sample_training_data()
         training_labels = self._get_sample_training_labels()
         
         if training_texts and training_labels:
-            X = self.vectorizer.fit_transform(training_texts)
+            X = self.vectorizer.transform(training_texts)
             self.esg_classifier.fit(X, training_labels)
             
             # Save the trained model
@@ -150,15 +411,72 @@ class ESGMLAnalyzer:
     def _save_models(self):
         """Save trained models to disk"""
         try:
-            if self.esg_classifier:
-                with open(os.path.join(self.models_dir, "esg_classifier.pkl"), 'wb') as f:
-                    pickle.dump(self.esg_classifier, f)
+            # The classifier goes last: other processes reload both models
+            # once its file changes
             if self.vectorizer:
-                with open(os.path.join(self.models_dir, "vectorizer.pkl"), 'wb') as f:
-                    pickle.dump(self.vectorizer, f)
+                self._dump_model(self.vectorizer, "vectorizer.joblib")
+            if self.esg_classifier:
+                self._dump_model(self.esg_classifier, "esg_classifier.joblib")
+                self._model_mtime = self._stored_model_mtime()
         except Exception as e:
             print(f"Error saving models: {e}")
     
+    def _dump_model(self, model, file_name: str):
+        """
+        Save a model uncompressed so it can be memory-mapped on load
+        
+        The file is written under a temporary name and renamed into place:
+        overwriting it in place would corrupt the copy other processes
+        currently have memory-mapped.
+        """
+        path = os.path.join(self.models_dir, file_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+    
+    def train_classifier(self, texts: List[str], labels: List[str], incremental: bool = False) -> Dict:
+        """
+        Retrain the ESG category classifier on custom labeled data
+        
+        Args:
+            texts: Training texts
+            labels: ESG category label for each text
+            incremental: Update the current model with partial_fit instead of
+                         training from scratch (only possible when the current
+                         model is a hashing/SGD model that already knows every label)
+            
+        Returns:
+            Training summary
+        """
+        if not SKLEARN_AVAILABLE:
+            raise RuntimeError("Training the classifier requires scikit-learn and joblib")
+        
+        can_update = (
+            incremental
+            and isinstance(self.vectorizer, HashingVectorizer)
+            and isinstance(self.esg_classifier, SGDClassifier)
+            and set(labels).issubset(self.esg_classifier.classes_)
+        )
+        
+        if can_update:
+            # Update a copy so requests keep using a consistent model meanwhile
+            vectorizer = self.vectorizer
+            classifier = copy.deepcopy(self.esg_classifier)
+            classifier.partial_fit(vectorizer.transform(texts), labels)
+        else:
+            vectorizer, classifier = self._new_classifier_models()
+            classifier.fit(vectorizer.transform(texts), labels)
+        
+        with self._model_lock:
+            self._swap_classifier(vectorizer, classifier)
+            self._save_models()
+        
+        return {
+            'training_samples': len(texts),
+            'incremental': can_update,
+            'classes': [str(label) for label in classifier.classes_]
+        }
+    
     def analyze_sentiment(self, text: str) -> Dict[str, any]:
         """
         Analyze sentiment of text
@@ -169,22 +487,87 @@ class ESGMLAnalyzer:
         Returns:
             Dictionary with sentiment label and score
         """
-        if not text or not text.strip():
-            return {"label": "neutral", "score": 0.5, "method": "default"}
+        return self.analyze_sentiment_batch([text])[0]
+    
+    def analyze_sentiment_batched(self, text: str) -> Dict[str, any]:
+        """
+        Analyze sentiment of one text, batched with concurrent callers
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Dictionary with sentiment label and score
+        """
+        return self._sentiment_batcher.run(text)
+    
+    def analyze_sentiment_batch(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, any]]:
+        """
+        Analyze sentiment of many texts in one pass
         
-        # Try transformer-based analysis first
+        Args:
+            texts: Texts to analyze
+            batch_size: Number of texts per transformer forward pass
+            
+        Returns:
+            Sentiment dictionaries aligned with texts
+        """
+        results = [None] * len(texts)
+        pending = {}  # Content key -> indices of the uncached texts with it
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = {"label": "neutral", "score": 0.5, "method": "default"}
+                continue
+            
+            # Repeated headlines skip the model entirely
+            key = content_key(text)
+            cache_hit, cached = self._sentiment_cache.get(key)
+            if cache_hit:
+                results[i] = dict(cached)
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        if pending:
+            # Duplicates within the batch go through the model once
+            computed = self._compute_sentiments([texts[indices[0]] for indices in pending.values()], batch_size)
+            for (key, indices), result in zip(pending.items(), computed):
+                self._sentiment_cache.set(key, result)
+                for i in indices:
+                    results[i] = dict(result)
+        
+        return results
+    
+    def _compute_sentiments(self, texts: List[str], batch_size: int) -> List[Dict[str, any]]:
+        """Run the sentiment model over non-empty texts"""
+        # Try transformer-based analysis first, batched across all texts
         if self.sentiment_analyzer and TRANSFORMERS_AVAILABLE:
             try:
-                result = self.sentiment_analyzer(text[:512])[0]  # Limit text length
-                return {
-                    "label": result['label'].lower(),
-                    "score": result['score'],
-                    "method": "transformer"
-                }
+                # Feed texts shortest first so each batch holds similar lengths
+                # and pads little; results are written back by original index
+                by_length = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+                # No autograd bookkeeping is needed for inference
+                with torch.inference_mode():
+                    outputs = self.sentiment_analyzer(
+                        [texts[i][:512] for i in by_length],  # Limit text length
+                        batch_size=batch_size,
+                        truncation=True  # Keep every input within the model's token limit
+                    )
+                results = [None] * len(texts)
+                for i, result in zip(by_length, outputs):
+                    results[i] = {
+                        "label": result['label'].lower(),
+                        "score": result['score'],
+                        "method": "transformer"
+                    }
+                return results
             except Exception as e:
                 print(f"Transformer sentiment failed: {e}, falling back to TextBlob")
         
         # Fallback to TextBlob
+        return [self._textblob_sentiment(text) for text in texts]
+    
+    def _textblob_sentiment(self, text: str) -> Dict[str, any]:
+        """Lexicon-based sentiment used when no transformer is available"""
         blob = TextBlob(text)
         polarity = blob.sentiment.polarity
         
@@ -213,57 +596,119 @@ class ESGMLAnalyzer:
         Returns:
             Dictionary with category predictions and scores
         """
-        if not text or not text.strip():
-            return {"category": "unknown", "confidence": 0.0, "scores": {}}
-        
-        text_lower = text.lower()
+        return self.classify_esg_category_batch([text])[0]
+    
+    def classify_esg_category_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        """
+        Classify many texts into ESG categories in one pass
         
-        # Keyword-based scoring
-        category_scores = {
-            'environmental': 0,
-            'social': 0,
-            'governance': 0
-        }
+        Args:
+            texts: Texts to classify
+            
+        Returns:
+            Category dictionaries aligned with texts
+        """
+        return self._classify_categories(texts)
+    
+    def _classify_categories(self, texts: List[str], lowered: Optional[List[str]] = None) -> List[Dict[str, any]]:
+        """Classify texts, reusing lowercased copies when the caller already made them"""
+        self._refresh_classifier()
+        results = [None] * len(texts)
+        pending = {}  # Content key -> indices of the uncached texts with it
         
-        for category, keywords in self.esg_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = {"category": "unknown", "confidence": 0.0, "scores": {}}
+                continue
+            
+            # Keyed on the classifier version so retraining never serves
+            # categories predicted by the old model
+            key = (self._classifier_version, content_key(text))
+            cache_hit, cached = self._category_cache.get(key)
+            if cache_hit:
+                results[i] = dict(cached)
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        if pending:
+            # Duplicates within the batch are classified once
+            first = [indices[0] for indices in pending.values()]
+            computed = self._compute_categories(
+                [texts[i] for i in first],
+                [lowered[i] for i in first] if lowered is not None else None
+            )
+            for (key, indices), result in zip(pending.items(), computed):
+                self._category_cache.set(key, result)
+                for i in indices:
+                    results[i] = dict(result)
+        
+        return results
+    
+    def _compute_categories(self, texts: List[str], lowered: Optional[List[str]] = None) -> List[Dict[str, any]]:
+        """Score non-empty texts by keywords and the ML classifier"""
+        keyword_scores = []
+        if lowered is None:
+            lowered = [text.lower() for text in texts]
+        
+        for text_lower in lowered:
+            # Keyword-based scoring
+            category_scores = {
+                'environmental': 0,
+                'social': 0,
+                'governance': 0
+            }
+            
+            for keyword in self._find_esg_keywords(text_lower):
+                for category in self._keyword_categories[keyword]:
                     category_scores[category] += 1
+            
+            keyword_scores.append(category_scores)
         
-        # ML-based classification if model exists
-        ml_prediction = None
+        # ML-based classification if model exists: one sparse transform and
+        # one predict_proba call for the whole batch. The predicted label is
+        # the argmax of those probabilities, so predict() is not run separately
+        ml_predictions = [None] * len(texts)
         if self.esg_classifier and self.vectorizer:
             try:
-                X = self.vectorizer.transform([text])
-                ml_prediction = self.esg_classifier.predict(X)[0]
-                ml_probabilities = self.esg_classifier.predict_proba(X)[0]
+                X = self.vectorizer.transform(texts)
+                ml_probabilities = self.esg_classifier.predict_proba(X)
+                classes = self.esg_classifier.classes_
+                ml_predictions = classes[np.argmax(ml_probabilities, axis=1)]
                 
                 # Combine keyword scores with ML predictions
-                for i, category in enumerate(self.esg_classifier.classes_):
-                    category_scores[category] += ml_probabilities[i] * 10
+                weighted_probabilities = (ml_probabilities * 10).tolist()
+                for category_scores, probabilities in zip(keyword_scores, weighted_probabilities):
+                    for category, weight in zip(classes, probabilities):
+                        category_scores[category] += weight
             except Exception as e:
                 print(f"ML classification error: {e}")
-        
-        # Determine primary category
-        if sum(category_scores.values()) == 0:
-            return {
-                "category": "general",
-                "confidence": 0.0,
+                ml_predictions = [None] * len(texts)
+        
+        results = []
+        for category_scores, ml_prediction in zip(keyword_scores, ml_predictions):
+            # Determine primary category
+            if sum(category_scores.values()) == 0:
+                results.append({
+                    "category": "general",
+                    "confidence": 0.0,
+                    "scores": category_scores,
+                    "method": "keyword"
+                })
+                continue
+            
+            primary_category = max(category_scores, key=category_scores.get)
+            total_score = sum(category_scores.values())
+            confidence = category_scores[primary_category] / total_score if total_score > 0 else 0
+            
+            results.append({
+                "category": primary_category,
+                "confidence": confidence,
                 "scores": category_scores,
-                "method": "keyword"
-            }
+                "ml_prediction": ml_prediction,
+                "method": "hybrid"
+            })
         
-        primary_category = max(category_scores, key=category_scores.get)
-        total_score = sum(category_scores.values())
-        confidence = category_scores[primary_category] / total_score if total_score > 0 else 0
-        
-        return {
-            "category": primary_category,
-            "confidence": confidence,
-            "scores": category_scores,
-            "ml_prediction": ml_prediction,
-            "method": "hybrid"
-        }
+        return results
     
     def calculate_esg_scores(self, text_data: List[str], historical_data: Optional[Dict] = None) -> Dict[str, float]:
         """
@@ -276,6 +721,60 @@ class ESGMLAnalyzer:
         Returns:
             Dictionary with E, S, G, and overall scores (0-100)
         """
+        return self.calculate_esg_scores_batch([text_data], [historical_data])[0]
+    
+    def calculate_esg_scores_batched(self, text_data: List[str]) -> Dict[str, float]:
+        """
+        Calculate ESG scores for one group of texts, batched with concurrent callers
+        
+        Args:
+            text_data: List of text snippets to analyze
+            
+        Returns:
+            Dictionary with E, S, G, and overall scores (0-100)
+        """
+        if len(text_data) >= _BATCHED_SCORE_MAX_TEXTS:
+            # Already fills a model batch; queueing it would only hold up smaller callers
+            return self.calculate_esg_scores(text_data)
+        return self._score_batcher.run(text_data)
+    
+    def calculate_esg_scores_batch(self, text_groups: List[List[str]],
+                                   historical_data: Optional[List[Optional[Dict]]] = None) -> List[Dict[str, float]]:
+        """
+        Calculate ESG scores for several groups of texts with one batched
+        sentiment and classification pass over all of them
+        
+        Args:
+            text_groups: One list of text snippets per score to compute
+            historical_data: Optional historical ESG data aligned with text_groups
+            
+        Returns:
+            Score dictionaries aligned with text_groups
+        """
+        if historical_data is None:
+            historical_data = [None] * len(text_groups)
+        
+        # Flatten non-empty texts so the models see a single batch
+        flat_texts = []
+        bounds = []
+        for text_data in text_groups:
+            start = len(flat_texts)
+            flat_texts.extend(text for text in (text_data or []) if text and text.strip())
+            bounds.append((start, len(flat_texts)))
+        
+        sentiments = self.analyze_sentiment_batch(flat_texts)
+        categories = self.classify_esg_category_batch(flat_texts)
+        
+        return [
+            self._aggregate_esg_scores(
+                text_data, sentiments[start:end], categories[start:end], history
+            )
+            for text_data, (start, end), history in zip(text_groups, bounds, historical_data)
+        ]
+    
+    def _aggregate_esg_scores(self, text_data: List[str], sentiments: List[Dict],
+                              categories: List[Dict], historical_data: Optional[Dict]) -> Dict[str, float]:
+        """Combine per-text sentiment and category results into ESG scores"""
         if not text_data:
             return {
                 "e_score": 50.0,
@@ -285,36 +784,26 @@ class ESGMLAnalyzer:
                 "confidence": 0.0
             }
         
-        category_sentiments = {
-            'environmental': [],
-            'social': [],
-            'governance': []
-        }
-        
-        # Analyze each text snippet
-        for text in text_data:
-            if not text or not text.strip():
-                continue
-            
-            # Get sentiment and category
-            sentiment = self.analyze_sentiment(text)
-            category_info = self.classify_esg_category(text)
-            
-            category = category_info['category']
-            if category in category_sentiments:
-                # Convert sentiment to 0-100 score
-                sentiment_score = sentiment['score'] * 100
-                confidence = category_info['confidence']
-                weighted_score = sentiment_score * confidence
-                category_sentiments[category].append(weighted_score)
-        
-        # Calculate average scores for each category
-        e_score = np.mean(category_sentiments['environmental']) if category_sentiments['environmental'] else 50.0
-        s_score = np.mean(category_sentiments['social']) if category_sentiments['social'] else 50.0
-        g_score = np.mean(category_sentiments['governance']) if category_sentiments['governance'] else 50.0
+        # Each snippet's sentiment as a 0-100 score weighted by category
+        # confidence; snippets outside E/S/G get index -1 and are dropped
+        category_index = np.array(
+            [_SCORE_CATEGORIES.get(category_info['category'], -1) for category_info in categories], dtype=np.intp
+        )
+        weighted_scores = (
+            np.array([sentiment['score'] for sentiment in sentiments], dtype=float) * 100
+            * np.array([category_info['confidence'] for category_info in categories], dtype=float)
+        )
+        in_category = category_index >= 0
+        category_index = category_index[in_category]
+        
+        # Average per category in one reduction; categories with no snippets default to 50
+        sums = np.bincount(category_index, weights=weighted_scores[in_category], minlength=3)
+        counts = np.bincount(category_index, minlength=3)
+        category_means = np.divide(sums, counts, out=np.full(3, 50.0), where=counts > 0)
+        e_score, s_score, g_score = category_means.tolist()
         
         # Calculate overall score (weighted average)
-        overall_score = (e_score * 0.35 + s_score * 0.35 + g_score * 0.30)
+        overall_score = float(category_means @ _OVERALL_WEIGHTS)
         
         # If historical data provided, blend with current analysis
         if historical_data:
@@ -345,54 +834,79 @@ class ESGMLAnalyzer:
             threshold: Threshold for risk detection (0-1)
             
         Returns:
-            List of detected risks with severity and category
+            List of detected risks with severity and category, most severe first
         """
+        # Identical text for the same threshold yields identical risks, so
+        # skip model inference for repeated requests within the cache window
+        self._refresh_classifier()
+        cache_key = self._risk_cache_key(text_data, threshold)
+        cache_hit, cached_risks = self._risk_cache.get(cache_key)
+        if cache_hit:
+            # Copies, so callers can't modify the cached risks
+            return [dict(risk) for risk in cached_risks]
+        
         risks = []
         
-        # Risk keywords
-        risk_keywords = {
-            'environmental': ['pollution', 'spill', 'contamination', 'violation', 'fine', 'lawsuit'],
-            'social': ['discrimination', 'harassment', 'violation', 'lawsuit', 'strike', 'accident'],
-            'governance': ['fraud', 'corruption', 'scandal', 'investigation', 'lawsuit', 'breach']
-        }
+        # One batched sentiment pass over all texts
+        texts = [text for text in text_data if text and text.strip()]
+        sentiments = self.analyze_sentiment_batch(texts)
         
-        for text in text_data:
-            if not text or not text.strip():
+        # Only negative texts mentioning a risk keyword can become risks,
+        # so the cheap keyword sweep runs before any classification
+        candidates = []
+        for text, sentiment in zip(texts, sentiments):
+            if not (sentiment['label'] == 'negative' or sentiment['score'] < 0.4):
                 continue
             
+            # Lowercased once and shared by keyword matching and classification
             text_lower = text.lower()
-            sentiment = self.analyze_sentiment(text)
-            category_info = self.classify_esg_category(text)
+            found_keywords = self._find_risk_keywords(text_lower)
+            if found_keywords:
+                candidates.append((text, text_lower, sentiment, found_keywords))
+        
+        # Classify just the candidates, in one batch
+        categories = self._classify_categories(
+            [text for text, _, _, _ in candidates],
+            [text_lower for _, text_lower, _, _ in candidates]
+        )
+        
+        # Risks from one call share the time they were detected
+        detected_at = datetime.utcnow().isoformat()
+        for (text, _, sentiment, found_keywords), category_info in zip(candidates, categories):
+            # The first risk keyword in listed order wins
+            risk_category, keyword = next(
+                (risk_category, keyword)
+                for risk_category, keywords in self.risk_keywords.items()
+                for keyword in keywords
+                if keyword in found_keywords
+            )
+            severity = self._calculate_risk_severity(sentiment['score'], keyword)
             
-            # Check for negative sentiment
-            if sentiment['label'] == 'negative' or sentiment['score'] < 0.4:
-                category = category_info['category']
-                
-                # Check for risk keywords
-                risk_found = False
-                for risk_category, keywords in risk_keywords.items():
-                    for keyword in keywords:
-                        if keyword in text_lower:
-                            risk_found = True
-                            severity = self._calculate_risk_severity(sentiment['score'], keyword)
-                            
-                            risks.append({
-                                'text': text[:200],  # First 200 chars
-                                'category': risk_category,
-                                'severity': severity,
-                                'sentiment_score': sentiment['score'],
-                                'confidence': category_info['confidence'],
-                                'timestamp': datetime.utcnow().isoformat()
-                            })
-                            break
-                    if risk_found:
-                        break
-        
-        # Sort by severity
-        risks.sort(key=lambda x: x['severity'], reverse=True)
+            risks.append({
+                'text': text[:200],  # First 200 chars
+                'category': risk_category,
+                'severity': severity,
+                'sentiment_score': sentiment['score'],
+                'confidence': category_info['confidence'],
+                'timestamp': detected_at
+            })
+        
+        # Most severe first
+        risks.sort(key=lambda x: _SEVERITY_RANK[x['severity']], reverse=True)
+        
+        # Cache copies of the results, so callers can't modify the cached risks
+        self._risk_cache.set(cache_key, [dict(risk) for risk in risks])
         
         return risks
     
+    def _risk_cache_key(self, text_data: List[str], threshold: float) -> str:
+        """Build a content-hash cache key for risk detection"""
+        key_hash = hashlib.sha256(f"{threshold}|".encode('utf-8'))
+        for text in text_data:
+            key_hash.update((text or '').encode('utf-8'))
+            key_hash.update(b'\x1f')
+        return key_hash.hexdigest()
+    
     def _calculate_risk_severity(self, sentiment_score: float, keyword: str) -> str:
         """
         Calculate risk severity based on sentiment and keyword
@@ -404,9 +918,7 @@ class ESGMLAnalyzer:
         Returns:
             Severity level: 'low', 'medium', 'high', 'critical'
         """
-        critical_keywords = ['fraud', 'corruption', 'lawsuit', 'investigation', 'spill']
-        
-        if keyword in critical_keywords and sentiment_score < 0.3:
+        if keyword in self._critical_keywords and sentiment_score < 0.3:
             return 'critical'
         elif sentiment_score < 0.25:
             return 'high'
@@ -460,25 +972,30 @@ class ESGMLAnalyzer:
         # Risks
         risks = analysis_results.get('risks', [])
         if risks:
-            critical_risks = [r for r in risks if r['severity'] == 'critical']
-            high_risks = [r for r in risks if r['severity'] == 'high']
+            severity_counts = Counter(r['severity'] for r in risks)
+            critical_count = severity_counts['critical']
+            high_count = severity_counts['high']
             
-            if critical_risks:
-                insights.append(f"⚠️ {len(critical_risks)} critical risk(s) detected requiring immediate action")
-            if high_risks:
-                insights.append(f"⚠️ {len(high_risks)} high-priority risk(s) identified")
+            if critical_count:
+                insights.append(f"⚠️ {critical_count} critical risk(s) detected requiring immediate action")
+            if high_count:
+                insights.append(f"⚠️ {high_count} high-priority risk(s) identified")
         
         return insights
 
 
 # Global instance
 _ml_analyzer = None
+_ml_analyzer_lock = threading.Lock()
 
 
 def get_ml_analyzer() -> ESGMLAnalyzer:
     """Get or create the global ML analyzer instance"""
     global _ml_analyzer
     if _ml_analyzer is None:
-        models_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'models')
-        _ml_analyzer = ESGMLAnalyzer(models_dir=models_dir)
+        # Lock so concurrent first requests don't each load the models
+        with _ml_analyzer_lock:
+            if _ml_analyzer is None:
+                models_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'models')
+                _ml_analyzer = ESGMLAnalyzer(models_dir=models_dir)
     return _ml_analyzer
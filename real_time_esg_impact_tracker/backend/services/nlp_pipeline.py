@@ -2,12 +2,23 @@
 NLP Processing Pipeline for ESG Text Analysis
 Combines data collection, ML analysis, and report generation
 """
-from typing import Dict, List, Optional
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
-import json
 
+from backend.services.cache import get_result_cache
 from backend.services.data_collector import get_data_collector
 from backend.services.ml_analyzer import get_ml_analyzer
+from backend.utils.json_provider import dumps_pretty
+
+logger = logging.getLogger(__name__)
+
+# Section rules for text reports
+_REPORT_RULE = '=' * 50
+_SECTION_RULE = '-' * 50
 
 
 class ESGNLPPipeline:
@@ -20,51 +31,76 @@ class ESGNLPPipeline:
         self.data_collector = get_data_collector()
         self.ml_analyzer = get_ml_analyzer()
     
-    def analyze_company(self, company_name: str, max_articles: int = 20) -> Dict:
+    def analyze_company(self, company_name: str, max_articles: int = 20,
+                        precollected: Optional[Dict] = None) -> Dict:
         """
         Complete analysis of a company's ESG performance
         
         Args:
             company_name: Name of the company to analyze
             max_articles: Maximum number of articles to collect
+            precollected: Data collect_company_data already returned for this
+                          company, analyzed instead of collecting again
             
         Returns:
             Complete analysis results
         """
-        # Step 1: Collect data
-        print(f"Collecting data for {company_name}...")
-        collected_data = self.data_collector.collect_company_data(company_name, max_articles)
+        # Step 1: Collect data. The news feeds usually finish before the ESG
+        # mention searches, so the models start on the news articles while
+        # those are still downloading
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            news_models_done = []
+            if precollected is not None:
+                collected_data = precollected
+            else:
+                logger.info("Collecting data for %s...", company_name)
+                collected_data = self.data_collector.collect_company_data(
+                    company_name, max_articles,
+                    on_news=lambda articles: news_models_done.append(executor.submit(
+                        self._run_models,
+                        self.data_collector.aggregate_text_for_analysis({'news_articles': articles})
+                    ))
+                )
+            for future in news_models_done:
+                future.result()
         
         # Step 2: Aggregate text for analysis
-        print(f"Aggregating text data...")
+        logger.info("Aggregating text data...")
         text_data = self.data_collector.aggregate_text_for_analysis(collected_data)
         
-        # Step 3: Perform sentiment analysis on each text
-        print(f"Analyzing sentiment...")
-        sentiment_results = []
-        for text in text_data[:50]:  # Limit to prevent overload
-            sentiment = self.ml_analyzer.analyze_sentiment(text)
-            sentiment_results.append({
+        # Run both per-text models over every text up front. Their results are
+        # memoized, so texts done above are not run again, and steps 3-6
+        # below reuse them instead of each running the models again
+        logger.info("Running sentiment and category models...")
+        self._run_models(text_data)
+        
+        # Step 3: Perform sentiment analysis on each text, as one batch
+        logger.info("Analyzing sentiment...")
+        sample_texts = text_data[:50]  # Limit to prevent overload
+        sentiment_results = [
+            {
                 'text': text[:100],  # First 100 chars
                 'sentiment': sentiment
-            })
+            }
+            for text, sentiment in zip(sample_texts, self.ml_analyzer.analyze_sentiment_batch(sample_texts))
+        ]
         
-        # Step 4: Classify ESG categories
-        print(f"Classifying ESG categories...")
-        category_results = []
-        for text in text_data[:50]:
-            category = self.ml_analyzer.classify_esg_category(text)
-            category_results.append({
+        # Step 4: Classify ESG categories with one vectorizer/classifier pass
+        logger.info("Classifying ESG categories...")
+        category_results = [
+            {
                 'text': text[:100],
                 'category': category
-            })
+            }
+            for text, category in zip(sample_texts, self.ml_analyzer.classify_esg_category_batch(sample_texts))
+        ]
         
         # Step 5: Calculate ESG scores
-        print(f"Calculating ESG scores...")
+        logger.info("Calculating ESG scores...")
         esg_scores = self.ml_analyzer.calculate_esg_scores(text_data)
         
         # Step 6: Detect risks
-        print(f"Detecting risks...")
+        logger.info("Detecting risks...")
         risks = self.ml_analyzer.detect_esg_risks(text_data)
         
         # Step 7: Generate insights
@@ -104,6 +140,42 @@ class ESGNLPPipeline:
         
         return results
     
+    def _run_models(self, texts: List[str]):
+        """Run the sentiment and category models over texts, filling their result caches"""
+        # Side by side: the transformer releases the GIL, so classification overlaps it
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            categories_done = executor.submit(self.ml_analyzer.classify_esg_category_batch, texts)
+            self.ml_analyzer.analyze_sentiment_batch(texts)
+            categories_done.result()
+    
+    def cached_analysis(self, company_name: str, max_articles: int = 20) -> Tuple[bool, Dict]:
+        """
+        Analyze a company, reusing a recent analysis from the result cache
+        
+        Concurrent calls for the same company and max_articles share one
+        analysis run instead of each collecting and analyzing again.
+        
+        Args:
+            company_name: Name of the company to analyze
+            max_articles: Maximum number of articles to collect
+            
+        Returns:
+            (cache_hit, analysis) tuple
+        """
+        return get_result_cache().get_or_compute(
+            self.analysis_cache_key(company_name, max_articles),
+            lambda: self.analyze_company(company_name, max_articles)
+        )
+    
+    def analysis_cache_key(self, company_name: str, max_articles: int = 20) -> tuple:
+        """
+        Result cache key of a company analysis
+        
+        Includes the classifier version, so analyses made before the
+        classifier was retrained are not served afterwards.
+        """
+        return ('analyze', company_name, max_articles, self.ml_analyzer.classifier_version)
+    
     def analyze_specific_aspect(self, company_name: str, aspect: str) -> Dict:
         """
         Analyze a specific ESG aspect for a company
@@ -119,11 +191,12 @@ class ESGNLPPipeline:
         results = self.data_collector.search_specific_esg_topic(company_name, aspect)
         
         # Extract text
-        texts = [r.get('title', '') + ' ' + r.get('summary', '') for r in results]
+        texts = [r.title + ' ' + r.summary for r in results]
         
         # Analyze
-        sentiments = [self.ml_analyzer.analyze_sentiment(t) for t in texts if t.strip()]
-        categories = [self.ml_analyzer.classify_esg_category(t) for t in texts if t.strip()]
+        texts = [t for t in texts if t.strip()]
+        sentiments = self.ml_analyzer.analyze_sentiment_batch(texts)
+        categories = self.ml_analyzer.classify_esg_category_batch(texts)
         
         return {
             'company_name': company_name,
@@ -151,9 +224,18 @@ class ESGNLPPipeline:
         """
         comparisons = {}
         
-        for company in company_names:
-            # Quick analysis for each company
-            analysis = self.analyze_company(company, max_articles=10)
+        # Fetch the shared news feeds once and match every company against
+        # them in one pass; the analyses below then find their data cached
+        self.data_collector.collect_many(company_names, max_articles=10)
+        
+        # Quick analysis for each company, side by side rather than one after
+        # another (per-company searches and model calls release the GIL)
+        with ThreadPoolExecutor(max_workers=max(min(8, len(company_names)), 1)) as executor:
+            analyses = list(executor.map(
+                lambda company: self.cached_analysis(company, max_articles=10)[1], company_names
+            ))
+        
+        for company, analysis in zip(company_names, analyses):
             comparisons[company] = {
                 'esg_scores': analysis.get('esg_scores', {}),
                 'risk_count': len(analysis.get('risks', [])),
@@ -177,15 +259,19 @@ class ESGNLPPipeline:
         if not sentiment_results:
             return {'positive': 0, 'negative': 0, 'neutral': 0, 'average_score': 0.5}
         
-        sentiments = [r.get('sentiment', {}) for r in sentiment_results]
-        labels = [s.get('label', 'neutral') for s in sentiments]
-        scores = [s.get('score', 0.5) for s in sentiments]
+        # Count labels and total scores in a single pass
+        label_counts = Counter()
+        score_total = 0.0
+        for r in sentiment_results:
+            sentiment = r.get('sentiment', {})
+            label_counts[sentiment.get('label', 'neutral')] += 1
+            score_total += sentiment.get('score', 0.5)
         
         return {
-            'positive': labels.count('positive'),
-            'negative': labels.count('negative'),
-            'neutral': labels.count('neutral'),
-            'average_score': sum(scores) / len(scores) if scores else 0.5,
+            'positive': label_counts['positive'],
+            'negative': label_counts['negative'],
+            'neutral': label_counts['neutral'],
+            'average_score': score_total / len(sentiment_results),
             'total_analyzed': len(sentiment_results)
         }
     
@@ -194,14 +280,14 @@ class ESGNLPPipeline:
         if not category_results:
             return {'environmental': 0, 'social': 0, 'governance': 0, 'general': 0}
         
-        categories = [r.get('category', {}).get('category', 'general') for r in category_results]
+        category_counts = Counter(r.get('category', {}).get('category', 'general') for r in category_results)
         
         return {
-            'environmental': categories.count('environmental'),
-            'social': categories.count('social'),
-            'governance': categories.count('governance'),
-            'general': categories.count('general'),
-            'total': len(categories)
+            'environmental': category_counts['environmental'],
+            'social': category_counts['social'],
+            'governance': category_counts['governance'],
+            'general': category_counts['general'],
+            'total': len(category_results)
         }
     
     def _generate_recommendations(self, esg_scores: Dict, risks: List[Dict]) -> List[str]:
@@ -221,13 +307,12 @@ class ESGNLPPipeline:
             recommendations.append("Strengthen governance practices and compliance frameworks")
         
         # Risk-based recommendations
-        critical_risks = [r for r in risks if r.get('severity') == 'critical']
-        if critical_risks:
-            recommendations.append(f"Address {len(critical_risks)} critical risk(s) immediately")
+        severity_counts = Counter(r.get('severity') for r in risks)
+        if severity_counts['critical']:
+            recommendations.append(f"Address {severity_counts['critical']} critical risk(s) immediately")
         
-        high_risks = [r for r in risks if r.get('severity') == 'high']
-        if high_risks:
-            recommendations.append(f"Develop mitigation plans for {len(high_risks)} high-priority risk(s)")
+        if severity_counts['high']:
+            recommendations.append(f"Develop mitigation plans for {severity_counts['high']} high-priority risk(s)")
         
         # General recommendations
         if not recommendations:
@@ -239,25 +324,30 @@ class ESGNLPPipeline:
         """Generate insights from company comparisons"""
         insights = []
         
-        # Find best performer
-        best_overall = max(
-            comparisons.keys(),
-            key=lambda c: comparisons[c]['esg_scores'].get('overall_score', 0)
-        )
-        best_score = comparisons[best_overall]['esg_scores'].get('overall_score', 0)
-        insights.append(f"{best_overall} leads with overall ESG score of {best_score}")
+        if not comparisons:
+            return insights
         
-        # Find most environmental
-        best_env = max(
-            comparisons.keys(),
-            key=lambda c: comparisons[c]['esg_scores'].get('e_score', 0)
-        )
+        # Find the best performer, the most environmental company and the
+        # safest one in a single pass (ties go to the earliest company)
+        best_overall = best_env = safest = None
+        best_score = best_e_score = float('-inf')
+        min_risks = float('inf')
+        for company, data in comparisons.items():
+            scores = data['esg_scores']
+            overall_score = scores.get('overall_score', 0)
+            e_score = scores.get('e_score', 0)
+            if overall_score > best_score:
+                best_overall, best_score = company, overall_score
+            if e_score > best_e_score:
+                best_env, best_e_score = company, e_score
+            if data['risk_count'] < min_risks:
+                safest, min_risks = company, data['risk_count']
+        
+        insights.append(f"{best_overall} leads with overall ESG score of {best_score}")
         insights.append(f"{best_env} has strongest environmental performance")
         
         # Risk comparison
-        company_risks = {c: comparisons[c]['risk_count'] for c in comparisons.keys()}
-        safest = min(company_risks, key=company_risks.get)
-        insights.append(f"{safest} has lowest risk profile with {company_risks[safest]} identified risks")
+        insights.append(f"{safest} has lowest risk profile with {min_risks} identified risks")
         
         return insights
     
@@ -296,35 +386,44 @@ class ESGNLPPipeline:
         Returns:
             Formatted report string
         """
-        analysis = self.analyze_company(company_name)
-        
-        if format == 'json':
-            return json.dumps(analysis, indent=2)
+        _, analysis = self.cached_analysis(company_name)
+        return ''.join(self.iter_report(analysis, format))
+    
+    def iter_report(self, analysis: Dict, format: str = 'json') -> Iterator[str]:
+        """
+        Format an analysis as a report, one section at a time
         
-        elif format == 'text':
-            return self._format_text_report(analysis)
+        Args:
+            analysis: Result of analyze_company
+            format: Report format ('json', 'text', 'summary')
+            
+        Yields:
+            Consecutive chunks of the report
+        """
+        if format == 'text':
+            yield from self._iter_text_report(analysis)
         
         elif format == 'summary':
-            return self._format_summary_report(analysis)
+            yield from self._iter_summary_report(analysis)
         
         else:
-            return json.dumps(analysis, indent=2)
+            yield dumps_pretty(analysis)
     
-    def _format_text_report(self, analysis: Dict) -> str:
-        """Format analysis as text report"""
+    def _iter_text_report(self, analysis: Dict) -> Iterator[str]:
+        """Format analysis as text report, section by section"""
         company = analysis.get('company_name', 'Unknown')
         timestamp = analysis.get('analysis_timestamp', '')
         scores = analysis.get('esg_scores', {})
         
-        report = f"""
+        yield f"""
 ESG ANALYSIS REPORT
-{'=' * 50}
+{_REPORT_RULE}
 
 Company: {company}
 Analysis Date: {timestamp}
 
 ESG SCORES
-{'-' * 50}
+{_SECTION_RULE}
 Environmental Score:  {scores.get('e_score', 'N/A')}/100
 Social Score:         {scores.get('s_score', 'N/A')}/100  
 Governance Score:     {scores.get('g_score', 'N/A')}/100
@@ -332,53 +431,48 @@ Overall Score:        {scores.get('overall_score', 'N/A')}/100
 Confidence:           {scores.get('confidence', 'N/A')}
 
 KEY INSIGHTS
-{'-' * 50}
+{_SECTION_RULE}
 """
-        for insight in analysis.get('insights', []):
-            report += f"• {insight}\n"
+        yield ''.join(f"• {insight}\n" for insight in analysis.get('insights', []))
         
-        report += f"""
+        yield f"""
 RECOMMENDATIONS
-{'-' * 50}
+{_SECTION_RULE}
 """
-        for rec in analysis.get('recommendations', []):
-            report += f"• {rec}\n"
+        yield ''.join(f"• {rec}\n" for rec in analysis.get('recommendations', []))
         
         risks = analysis.get('risks', [])
         if risks:
-            report += f"""
+            yield f"""
 TOP RISKS IDENTIFIED
-{'-' * 50}
+{_SECTION_RULE}
 """
-            for i, risk in enumerate(risks[:5], 1):
-                report += f"{i}. [{risk.get('severity', 'unknown').upper()}] "
-                report += f"{risk.get('category', 'general')}: {risk.get('text', 'N/A')[:100]}...\n"
-        
-        return report
+            yield ''.join(
+                f"{i}. [{risk.get('severity', 'unknown').upper()}] "
+                f"{risk.get('category', 'general')}: {risk.get('text', 'N/A')[:100]}...\n"
+                for i, risk in enumerate(risks[:5], 1)
+            )
     
-    def _format_summary_report(self, analysis: Dict) -> str:
-        """Format analysis as brief summary"""
+    def _iter_summary_report(self, analysis: Dict) -> Iterator[str]:
+        """Format analysis as brief summary, line by line"""
         company = analysis.get('company_name', 'Unknown')
         scores = analysis.get('esg_scores', {})
         overall = scores.get('overall_score', 0)
         
-        summary = f"{company} ESG Summary:\n"
-        summary += f"Overall Score: {overall}/100\n"
-        summary += f"Top Insights:\n"
-        
-        for insight in analysis.get('insights', [])[:3]:
-            summary += f"  • {insight}\n"
-        
-        return summary
+        yield f"{company} ESG Summary:\nOverall Score: {overall}/100\nTop Insights:\n"
+        yield ''.join(f"  • {insight}\n" for insight in analysis.get('insights', [])[:3])
 
 
 # Global instance
 _nlp_pipeline = None
+_nlp_pipeline_lock = threading.Lock()
 
 
 def get_nlp_pipeline() -> ESGNLPPipeline:
     """Get or create the global NLP pipeline instance"""
     global _nlp_pipeline
     if _nlp_pipeline is None:
-        _nlp_pipeline = ESGNLPPipeline()
+        with _nlp_pipeline_lock:
+            if _nlp_pipeline is None:
+                _nlp_pipeline = ESGNLPPipeline()
     return _nlp_pipeline
@@ -5,11 +5,16 @@ Functions to interact with Ollama for ESG analysis
 import requests
 from config import OLLAMA_HOST
 
+from backend.services.cache import content_key, get_result_cache
+
 
 def query_ollama(prompt: str, model: str = "llama2") -> str:
     """
     Sends a prompt to the local Ollama model and returns the response.
     
+    Responses are cached by (model, prompt), so repeated prompts skip the LLM,
+    and identical prompts arriving together wait for one generation.
+    
     Args:
         prompt (str): The prompt to send to the LLM
         model (str): The Ollama model to use (default: llama2)
@@ -24,7 +29,14 @@ def query_ollama(prompt: str, model: str = "llama2") -> str:
         - Implement error handling and retry logic
         - Support different models and parameters
     """
-    
+    _, response = get_result_cache().get_or_compute(
+        ('ollama', model, content_key(prompt)), lambda: _generate(prompt, model)
+    )
+    return response
+
+
+def _generate(prompt: str, model: str) -> str:
+    """Run one prompt through the model (uncached)"""
     # Stub implementation - returns mock response
     print(f"[OLLAMA STUB] Prompt: {prompt}")
     print(f"[OLLAMA STUB] Model: {model}")
@@ -0,0 +1,124 @@
+"""
+Dynamic request batching
+Fuses single-item calls from concurrent requests into one batched computation
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional
+
+
+class DynamicBatcher:
+    """
+    Queues items submitted by concurrent callers and hands them to a batch
+    function together, so a model sees one forward pass instead of many
+    """
+    
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait: float = 0.05, wait_timeout: Optional[float] = None, workers: int = 1):
+        """
+        Initialize the batcher
+        
+        Args:
+            process_batch: Function mapping a list of items to results aligned with it
+            max_batch_size: Most items handed to process_batch at once
+            max_wait: Seconds a batch waits for more items when other callers
+                      are queued (a lone item is processed right away)
+            wait_timeout: Seconds a caller blocks for its result (None = no limit)
+            workers: Batches processed at the same time, so one slow batch
+                     doesn't hold up every later caller
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.wait_timeout = wait_timeout
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._worker_pid = None
+    
+    def submit(self, item: Any) -> Future:
+        """
+        Queue one item for the next batch
+        
+        Args:
+            item: Item to process
+        
+        Returns:
+            Future resolving to the item's result
+        """
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+    
+    def run(self, item: Any) -> Any:
+        """
+        Process one item as part of a batch, blocking until its result is ready
+        
+        Args:
+            item: Item to process
+        
+        Returns:
+            The result process_batch produced for item
+        
+        Raises:
+            TimeoutError: If wait_timeout is set and the result is not ready in time
+        """
+        try:
+            return self.submit(item).result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Batched call did not finish within {self.wait_timeout} seconds") from None
+    
+    def _ensure_worker(self):
+        """Start the worker threads on first use (and again in forked workers)"""
+        pid = os.getpid()
+        if self._worker_pid == pid and all(worker.is_alive() for worker in self._workers):
+            return
+        
+        with self._lock:
+            if self._worker_pid != pid:
+                # Threads do not survive fork; neither should the parent's queue
+                self._queue = queue.Queue()
+                self._workers = []
+                self._worker_pid = pid
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.workers:
+                worker = threading.Thread(target=self._run, name='dynamic-batcher', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+    
+    def _run(self):
+        """Collect up to max_batch_size items, then process them"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                
+                # Only wait for stragglers when other callers are already
+                # batching; a lone request goes straight through
+                remaining = deadline - time.monotonic()
+                if len(batch) == 1 or remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
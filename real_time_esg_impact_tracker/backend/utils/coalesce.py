@@ -0,0 +1,57 @@
+"""
+In-flight request coalescing
+Lets concurrent callers asking for the same expensive result share one computation
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class InflightCoalescer:
+    """
+    Runs at most one computation per key at a time; callers that arrive while
+    a computation for their key is running wait for and share its result
+    """
+    
+    def __init__(self, wait_timeout: Optional[float] = 30):
+        """
+        Initialize the coalescer
+        
+        Args:
+            wait_timeout: Seconds a waiting caller blocks for the shared result
+        """
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+    
+    def run(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Return func() for key, sharing the result with concurrent callers
+        
+        Args:
+            key: Identifies equivalent computations
+            func: Zero-argument callable that performs the work
+            
+        Returns:
+            The result of func (or of the in-flight call it was coalesced with)
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_owner:
+            return future.result(timeout=self.wait_timeout)
+        
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
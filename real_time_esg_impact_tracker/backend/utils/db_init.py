@@ -43,8 +43,10 @@ def add_seed_data():
     company2 = Company(name="EcoEnergy Corp.", industry="Energy")
     company3 = Company(name="SustainableGoods Ltd.", industry="Retail")
     
+    # Flush (not commit) to get company ids; everything below is saved in
+    # a single transaction
     db.session.add_all([company1, company2, company3])
-    db.session.commit()
+    db.session.flush()
     
     # Create sample ESG scores
     score1 = ESGScore(
@@ -62,9 +64,6 @@ def add_seed_data():
         overall_score=86.8
     )
     
-    db.session.add_all([score1, score2])
-    db.session.commit()
-    
     # Create sample alerts
     alert1 = Alert(
         company_id=company1.id,
@@ -77,7 +76,7 @@ def add_seed_data():
         severity="info"
     )
     
-    db.session.add_all([alert1, alert2])
+    db.session.add_all([score1, score2, alert1, alert2])
     db.session.commit()
     
     print("Seed data added successfully!")
@@ -0,0 +1,86 @@
+"""
+orjson-backed JSON provider for Flask
+Used by jsonify() and request.get_json() when orjson is installed, and for
+JSON reports built outside a request
+"""
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+def _default(obj):
+    """Convert msgspec Structs (collected articles etc.) and Flask's extra types"""
+    if MSGSPEC_AVAILABLE and isinstance(obj, msgspec.Struct):
+        return msgspec.to_builtins(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class StructJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default JSON provider, extended to encode msgspec Structs
+    """
+    
+    default = staticmethod(_default)
+
+
+class ORJSONProvider(StructJSONProvider):
+    """
+    JSON provider that encodes and decodes with orjson, falling back to
+    Flask's default handling for types orjson does not know about
+    """
+    
+    option = orjson.OPT_SERIALIZE_NUMPY if ORJSON_AVAILABLE else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize obj to a JSON string"""
+        if kwargs:
+            # orjson has no equivalent for json.dumps keyword options
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        """Serialize the arguments straight to a JSON response body"""
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option) + b"\n",
+            mimetype=self.mimetype
+        )
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def dumps_pretty(obj) -> str:
+    """
+    Serialize obj to an indented JSON string (orjson when installed)
+    
+    Args:
+        obj: JSON-compatible object; NumPy scalars and arrays and msgspec
+             Structs are allowed
+        
+    Returns:
+        JSON text indented by two spaces
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+    return json.dumps(obj, default=_default, indent=2)
@@ -0,0 +1,34 @@
+"""
+Keyword Matching
+Finds which of many keywords occur in a text, in one pass when pyahocorasick is installed
+"""
+from typing import Callable, Iterable, Set
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def build_keyword_matcher(keywords: Iterable[str]) -> Callable[[str], Set[str]]:
+    """
+    Build a matcher finding which keywords occur as substrings of a text
+    
+    Args:
+        keywords: Keywords to look for, already in the case the texts will use
+    
+    Returns:
+        Function mapping a text to the set of keywords it contains
+    """
+    keywords = set(keywords)
+    
+    if AHOCORASICK_AVAILABLE and len(keywords) > 1:
+        # One pass over the text finds every keyword, however many there are
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(text)}
+    
+    return lambda text: {keyword for keyword in keywords if keyword in text}
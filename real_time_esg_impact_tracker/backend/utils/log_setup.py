@@ -0,0 +1,41 @@
+"""
+Logging setup
+Routes log records through a queue so request threads never block on writing them
+"""
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def configure_logging(level: str = 'INFO'):
+    """
+    Send root logger output to stderr from a background listener thread
+    
+    Safe to call more than once; only the first call installs handlers.
+    
+    Args:
+        level: Root log level name (e.g. 'INFO', 'WARNING')
+    """
+    root = logging.getLogger()
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    
+    def start_listener():
+        # A forked worker inherits the queue but not the listener thread, so
+        # each process drains a fresh queue with its own listener
+        queue_handler.queue = queue.SimpleQueue()
+        listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+    
+    start_listener()
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=start_listener)
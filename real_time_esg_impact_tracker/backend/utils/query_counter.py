@@ -0,0 +1,53 @@
+"""
+SQL Query Counter
+Development aid for spotting N+1 query regressions
+"""
+from contextlib import contextmanager
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+
+def _count_request_query(conn, cursor, statement, parameters, context, executemany):
+    """Count a statement against the current request"""
+    if has_app_context():
+        g.sql_query_count = g.get('sql_query_count', 0) + 1
+
+
+def install_query_counter(app, engine):
+    """
+    Count SQL statements per request and report them in an X-SQL-Count header
+    
+    Args:
+        app: Flask application
+        engine: SQLAlchemy engine to instrument
+    """
+    event.listen(engine, 'before_cursor_execute', _count_request_query)
+    
+    @app.after_request
+    def add_query_count_header(response):
+        query_count = g.get('sql_query_count', 0)
+        response.headers['X-SQL-Count'] = str(query_count)
+        app.logger.debug("%s %s issued %d SQL queries", request.method, request.path, query_count)
+        return response
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    Collect the SQL statements executed on engine inside the block
+    
+    Usage:
+        with count_queries(db.engine) as queries:
+            client.get('/api/alerts/companies')
+        assert len(queries) <= 2
+    """
+    queries = []
+    
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+    
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
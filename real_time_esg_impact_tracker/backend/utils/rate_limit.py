@@ -0,0 +1,41 @@
+"""
+Rate Limiting
+Token bucket for throttling outbound requests shared across threads
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing short bursts up to the rate
+    """
+    
+    def __init__(self, rate: float, period: float = 1.0):
+        """
+        Initialize the limiter
+        
+        Args:
+            rate: Requests allowed per period (also the burst size)
+            period: Period length in seconds
+        """
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+            self._updated = now
+            
+            # Reserve the token even when none is left so concurrent callers
+            # queue up behind each other instead of all waking at once
+            self._tokens -= 1
+            wait = -self._tokens / self.fill_rate if self._tokens < 0 else 0
+        
+        if wait:
+            time.sleep(wait)
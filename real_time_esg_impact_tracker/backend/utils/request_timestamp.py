@@ -0,0 +1,31 @@
+"""
+Request Timestamp
+Formats the response timestamp once per request instead of once per use
+"""
+from datetime import datetime
+from flask import g, has_app_context
+
+
+def install_request_timestamp(app):
+    """
+    Stamp each request with its UTC start time as an ISO-8601 string
+    
+    Args:
+        app: Flask application
+    """
+    @app.before_request
+    def stamp_request():
+        g.request_timestamp = datetime.utcnow().isoformat()
+
+
+def request_timestamp() -> str:
+    """
+    Get the current request's timestamp
+    
+    Returns:
+        ISO-8601 UTC timestamp; background jobs without a request get the
+        current time instead
+    """
+    if has_app_context() and 'request_timestamp' in g:
+        return g.request_timestamp
+    return datetime.utcnow().isoformat()
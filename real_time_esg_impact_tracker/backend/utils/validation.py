@@ -0,0 +1,44 @@
+"""
+Request Validation
+Shared JSON body checks for API endpoints
+"""
+from functools import wraps
+from typing import Dict, Optional
+from flask import g, jsonify, request
+
+
+def validate_json(*required: str, error: Optional[str] = None, arrays: Optional[Dict[str, str]] = None):
+    """
+    Decorator that parses the JSON body once, checks it and stores it in g.payload
+    
+    Args:
+        required: Keys that must be present in the body
+        error: Message returned when the body is empty or a required key is
+               missing (default: "<keys> is required")
+        arrays: Maps keys that must hold a list to the message returned when
+                they don't
+    
+    Returns:
+        Decorator returning 400 {"error": ...} for invalid bodies
+    """
+    missing_error = error or f"{' and '.join(required)} is required"
+    array_checks = tuple((arrays or {}).items())
+    
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json()
+            
+            if not data or any(key not in data for key in required):
+                return jsonify({"error": missing_error}), 400
+            
+            for key, array_error in array_checks:
+                if not isinstance(data.get(key), list):
+                    return jsonify({"error": array_error}), 400
+            
+            g.payload = data
+            return view(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
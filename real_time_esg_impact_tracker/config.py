@@ -10,6 +10,12 @@ load_dotenv()
 # Database Configuration
 DATABASE_URI = os.getenv('DATABASE_URI', 'sqlite:///esg_tracker.db')
 
+# Connection pool sizing (ignored for SQLite)
+SQLA_POOL_SIZE = int(os.getenv('SQLA_POOL_SIZE', '20'))
+SQLA_MAX_OVERFLOW = int(os.getenv('SQLA_MAX_OVERFLOW', '20'))
+SQLA_POOL_TIMEOUT = int(os.getenv('SQLA_POOL_TIMEOUT', '30'))
+SQLA_POOL_RECYCLE = int(os.getenv('SQLA_POOL_RECYCLE', '1800'))
+
 # Ollama Configuration
 OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama2')
@@ -18,6 +24,39 @@ OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama2')
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 DEBUG = os.getenv('DEBUG', 'True').lower() in ('true', '1', 'yes')
 
+# Load ML models when the app starts instead of on the first request
+# (off by default in debug so the reloader stays quick)
+PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', str(not DEBUG)).lower() in ('true', '1', 'yes')
+
+# Sentiment model precision ('auto' = float16 on GPU, float32 on CPU;
+# 'bfloat16' suits CPUs with AVX512-BF16/AMX) and whether to torch.compile
+# it (slower startup, faster inference)
+SENTIMENT_MODEL_DTYPE = os.getenv('SENTIMENT_MODEL_DTYPE', 'auto')
+SENTIMENT_TORCH_COMPILE = os.getenv('SENTIMENT_TORCH_COMPILE', 'False').lower() in ('true', '1', 'yes')
+# Export the sentiment model to int8 ONNX on first load when no export exists
+# yet (needs optimum[onnxruntime]; later loads reuse the export)
+SENTIMENT_ONNX_AUTO_EXPORT = os.getenv('SENTIMENT_ONNX_AUTO_EXPORT', 'False').lower() in ('true', '1', 'yes')
+
+# PyTorch intra-op threads per process (0 = PyTorch default of one per core;
+# with several server workers, cores / workers avoids oversubscribing the CPU)
+TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', '0'))
+
+# Browser cache lifetime (seconds) for frontend assets
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', '3600'))
+
+# Result cache for NLP/Ollama analysis (seconds, entries)
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '3600'))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '1024'))
+
+# Optional SQLite file persisting collected company data for the rest of the
+# UTC day, across restarts and workers (empty = in-memory caching only)
+COLLECTION_CACHE_PATH = os.getenv('COLLECTION_CACHE_PATH', '')
+
+# SQLite file holding background job status, so a status poll answered by
+# any server worker on this host finds the job (empty = per-process memory,
+# only suitable for a single worker)
+JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', 'esg_jobs.db')
+
 # API Configuration
 API_VERSION = 'v1'
 API_PREFIX = '/api'
@@ -0,0 +1,63 @@
+"""
+Gunicorn configuration for ESG Impact Tracker
+
+The API is dominated by I/O waits (database, RSS/news fetches, Ollama), so
+gevent workers are used by default to overlap those waits across many
+greenlets. Set GUNICORN_WORKER_CLASS=gthread to run a fixed pool of OS
+threads per worker instead; that mode preloads the app and ML models in the
+master so forked workers share the model memory copy-on-write.
+
+Usage:
+    gunicorn -c gunicorn_config.py
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'backend.app:create_app()'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))  # Used by gthread workers
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Preloading is on by default for gthread only; gevent workers must not
+# inherit a monkey-patched master
+preload_app = os.getenv(
+    'GUNICORN_PRELOAD', str(worker_class == 'gthread')
+).lower() in ('true', '1', 'yes')
+
+raw_env = []
+if worker_class == 'gevent':
+    # Ask backend.app to patch the stdlib and psycopg2 before the database
+    # driver is imported in each worker
+    raw_env.append('GEVENT_PATCH=true')
+
+if 'TORCH_NUM_THREADS' not in os.environ:
+    # Split the cores between workers so their PyTorch thread pools don't
+    # all run one thread per core at once
+    raw_env.append(f'TORCH_NUM_THREADS={max(1, multiprocessing.cpu_count() // workers)}')
+
+
+def when_ready(server):
+    """Load the ML models once in the master so preloaded workers share them"""
+    if not preload_app:
+        return
+    
+    from backend.services.ml_analyzer import get_ml_analyzer
+    from backend.services.nlp_pipeline import get_nlp_pipeline
+    
+    get_ml_analyzer().sentiment_analyzer  # Loaded lazily otherwise
+    get_nlp_pipeline()
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloaded master"""
+    if not preload_app:
+        return
+    
+    from backend.app import db
+    
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
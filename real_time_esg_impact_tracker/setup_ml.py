@@ -3,6 +3,7 @@
 Setup script for ML components
 Downloads required models and data
 """
+import importlib.util
 import os
 import sys
 
@@ -55,11 +56,12 @@ def test_imports():
     
     missing_packages = []
     
+    # Only locate each package; importing torch/transformers here would cost
+    # seconds each, and initialize_ml_models imports what it needs anyway
     for package, install_name in required_packages:
-        try:
-            __import__(package)
+        if importlib.util.find_spec(package) is not None:
             print(f"  ✅ {install_name}")
-        except ImportError:
+        else:
             print(f"  ❌ {install_name} (missing)")
             missing_packages.append(install_name)
     
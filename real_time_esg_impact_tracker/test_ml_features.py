@@ -3,12 +3,59 @@
 Test script for ML features
 Verifies that all ML components are working correctly
 """
+import argparse
+import io
 import sys
 import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
+
+# Output buffer of the suite running on the current thread, if any
+_suite_output = threading.local()
+
+# Company collected once and shared by the collector and pipeline suites
+SAMPLE_COMPANY = "Microsoft"
+SAMPLE_MAX_ARTICLES = 5
+_sample_data = None
+_sample_data_lock = threading.Lock()
+
+
+class SuiteOutput:
+    """Stand-in for stdout/stderr that sends a suite thread's output to its buffer"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return getattr(_suite_output, 'buffer', self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _report_failure(name, exc):
+    """Print a failed suite's error and traceback in one write"""
+    print(f"\n❌ {name} test failed: {exc}\n{traceback.format_exc()}", end='')
+
+
+def _collect_sample_data():
+    """Collect SAMPLE_COMPANY's data on first use; concurrent suites wait for that one pass"""
+    global _sample_data
+    with _sample_data_lock:
+        if _sample_data is None:
+            from backend.services.data_collector import get_data_collector
+            _sample_data = get_data_collector().collect_company_data(SAMPLE_COMPANY, max_articles=SAMPLE_MAX_ARTICLES)
+        return _sample_data
+
+
 def test_ml_analyzer():
     """Test ML analyzer functionality"""
     print("\n" + "="*60)
@@ -21,8 +68,26 @@ def test_ml_analyzer():
         analyzer = get_ml_analyzer()
         print("✅ ML Analyzer initialized")
         
-        # Test sentiment analysis
         test_text = "Company announces major sustainability initiative and carbon reduction targets"
+        test_text2 = "Board of directors implements new ethics and compliance framework"
+        test_texts = [
+            "Company reduces carbon emissions by 30%",
+            "New diversity program launched",
+            "Enhanced governance transparency"
+        ]
+        risk_texts = [
+            "Environmental pollution incident at factory",
+            "Lawsuit filed over workplace discrimination",
+            "Fraud investigation launched by regulators"
+        ]
+        
+        # Run both models once over every test string; the single-text calls
+        # below are then served from the analyzer's per-text results
+        all_texts = [test_text, test_text2, *test_texts, *risk_texts]
+        analyzer.analyze_sentiment_batch(all_texts)
+        analyzer.classify_esg_category_batch(all_texts)
+        
+        # Test sentiment analysis
         sentiment = analyzer.analyze_sentiment(test_text)
         print(f"\n📊 Sentiment Analysis:")
         print(f"   Text: {test_text[:60]}...")
@@ -31,7 +96,6 @@ def test_ml_analyzer():
         print(f"   Method: {sentiment.get('method')}")
         
         # Test category classification
-        test_text2 = "Board of directors implements new ethics and compliance framework"
         category = analyzer.classify_esg_category(test_text2)
         print(f"\n🏷️  Category Classification:")
         print(f"   Text: {test_text2[:60]}...")
@@ -39,11 +103,6 @@ def test_ml_analyzer():
         print(f"   Confidence: {category.get('confidence', 0):.2f}")
         
         # Test ESG scoring
-        test_texts = [
-            "Company reduces carbon emissions by 30%",
-            "New diversity program launched",
-            "Enhanced governance transparency"
-        ]
         scores = analyzer.calculate_esg_scores(test_texts)
         print(f"\n📈 ESG Scores:")
         print(f"   Environmental: {scores.get('e_score')}")
@@ -53,11 +112,6 @@ def test_ml_analyzer():
         print(f"   Confidence: {scores.get('confidence')}")
         
         # Test risk detection
-        risk_texts = [
-            "Environmental pollution incident at factory",
-            "Lawsuit filed over workplace discrimination",
-            "Fraud investigation launched by regulators"
-        ]
         risks = analyzer.detect_esg_risks(risk_texts)
         print(f"\n⚠️  Risk Detection:")
         print(f"   Risks detected: {len(risks)}")
@@ -68,9 +122,7 @@ def test_ml_analyzer():
         return True
         
     except Exception as e:
-        print(f"\n❌ ML Analyzer test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        _report_failure("ML Analyzer", e)
         return False
 
 
@@ -87,8 +139,8 @@ def test_data_collector():
         print("✅ Data Collector initialized")
         
         # Test data collection (limited to avoid long waits)
-        print("\n🔍 Collecting sample data for 'Tesla'...")
-        data = collector.collect_company_data("Tesla", max_articles=5)
+        print(f"\n🔍 Collecting sample data for '{SAMPLE_COMPANY}'...")
+        data = _collect_sample_data()
         
         print(f"   Company: {data.get('company_name')}")
         print(f"   News articles: {len(data.get('news_articles', []))}")
@@ -98,8 +150,8 @@ def test_data_collector():
         if data.get('news_articles'):
             print(f"\n   Sample article:")
             article = data['news_articles'][0]
-            print(f"     Title: {article.get('title', 'N/A')[:60]}...")
-            print(f"     Source: {article.get('source', 'N/A')}")
+            print(f"     Title: {article.title[:60]}...")
+            print(f"     Source: {article.source}")
         
         # Test text aggregation
         texts = collector.aggregate_text_for_analysis(data)
@@ -112,9 +164,7 @@ def test_data_collector():
         return True
         
     except Exception as e:
-        print(f"\n❌ Data Collector test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        _report_failure("Data Collector", e)
         return False
 
 
@@ -131,8 +181,10 @@ def test_nlp_pipeline():
         print("✅ NLP Pipeline initialized")
         
         # Test quick analysis (limited articles to speed up)
-        print("\n🔬 Running quick analysis for 'Microsoft'...")
-        analysis = pipeline.analyze_company("Microsoft", max_articles=5)
+        print(f"\n🔬 Running quick analysis for '{SAMPLE_COMPANY}'...")
+        analysis = pipeline.analyze_company(
+            SAMPLE_COMPANY, max_articles=SAMPLE_MAX_ARTICLES, precollected=_collect_sample_data()
+        )
         
         print(f"\n📊 Analysis Results:")
         print(f"   Company: {analysis.get('company_name')}")
@@ -162,16 +214,16 @@ def test_nlp_pipeline():
         
         # Test report generation
         print("\n📄 Generating summary report...")
-        report = pipeline.generate_report("Microsoft", format='summary')
+        # From the analysis above: generate_report would analyze again with
+        # its own max_articles
+        report = ''.join(pipeline.iter_report(analysis, format='summary'))
         print(f"\n{report}")
         
         print("\n✅ All NLP Pipeline tests passed!")
         return True
         
     except Exception as e:
-        print(f"\n❌ NLP Pipeline test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        _report_failure("NLP Pipeline", e)
         return False
 
 
@@ -181,6 +233,9 @@ def test_database_integration():
     print("Testing Database Integration")
     print("="*60)
     
+    # Nothing here runs a model; keep transformers quiet if the app pulls it in
+    os.environ.setdefault("TRANSFORMERS_NO_ADVISORY_WARNINGS", "1")
+    
     try:
         from backend.app import create_app, db
         from backend.database.models import Company, ESGScore, Alert
@@ -191,10 +246,13 @@ def test_database_integration():
             # Test database connection
             print("✅ Database connected")
             
-            # Count records
-            company_count = Company.query.count()
-            score_count = ESGScore.query.count()
-            alert_count = Alert.query.count()
+            # Count records (all three in one query)
+            company_count, score_count, alert_count = db.session.execute(
+                db.select(*(
+                    db.select(db.func.count()).select_from(model).scalar_subquery()
+                    for model in (Company, ESGScore, Alert)
+                ))
+            ).one()
             
             print(f"\n📊 Database Statistics:")
             print(f"   Companies: {company_count}")
@@ -206,7 +264,8 @@ def test_database_integration():
             if not test_company:
                 test_company = Company(name="Test ML Company", industry="Technology")
                 db.session.add(test_company)
-                db.session.commit()
+                # Flush for the id; the rows below are committed together
+                db.session.flush()
                 print("\n✅ Test company created")
             else:
                 print("\n✅ Test company found")
@@ -219,57 +278,82 @@ def test_database_integration():
                 g_score=72.1,
                 overall_score=71.8
             )
-            db.session.add(test_score)
-            db.session.commit()
-            print("✅ Test ESG score created")
             
             # Test creating alert
             test_alert = Alert(
                 company_id=test_company.id,
                 message="Test ML alert",
-                severity="info",
-                is_resolved=False
+                severity="info"
             )
-            db.session.add(test_alert)
+            
+            db.session.add_all([test_score, test_alert])
             db.session.commit()
+            print("✅ Test ESG score created")
             print("✅ Test alert created")
         
         print("\n✅ All Database Integration tests passed!")
         return True
         
     except Exception as e:
-        print(f"\n❌ Database Integration test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        _report_failure("Database Integration", e)
         return False
 
 
-def main():
-    """Run all tests"""
-    print("\n" + "🌍 "*20)
-    print("ESG IMPACT TRACKER - ML FEATURES TEST SUITE")
-    print("🌍 "*20 + "\n")
-    
-    tests = [
-        ("ML Analyzer", test_ml_analyzer),
-        ("Data Collector", test_data_collector),
-        ("NLP Pipeline", test_nlp_pipeline),
-        ("Database Integration", test_database_integration),
-    ]
-    
-    results = {}
-    
-    for test_name, test_func in tests:
+def run_suite(test_name, test_func):
+    """Run one test suite, capturing what it prints (tracebacks included)"""
+    _suite_output.buffer = io.StringIO()
+    try:
         print(f"\n{'='*60}")
         print(f"Running: {test_name}")
         print(f"{'='*60}")
         
         try:
             result = test_func()
-            results[test_name] = result
         except Exception as e:
             print(f"❌ Test suite '{test_name}' crashed: {e}")
-            results[test_name] = False
+            result = False
+    finally:
+        log = _suite_output.__dict__.pop('buffer').getvalue()
+    
+    return result, log
+
+
+SUITES = {
+    'ml': ("ML Analyzer", test_ml_analyzer),
+    'collector': ("Data Collector", test_data_collector),
+    'nlp': ("NLP Pipeline", test_nlp_pipeline),
+    'db': ("Database Integration", test_database_integration),
+}
+
+
+def main(argv=None):
+    """Run all tests, or only the suites named with --only"""
+    parser = argparse.ArgumentParser(description="ESG Impact Tracker ML features test suite")
+    parser.add_argument('--only', nargs='+', choices=list(SUITES), metavar='SUITE',
+                        help=f"run only these suites ({', '.join(SUITES)})")
+    args = parser.parse_args(argv)
+    
+    print("\n" + "🌍 "*20)
+    print("ESG IMPACT TRACKER - ML FEATURES TEST SUITE")
+    print("🌍 "*20 + "\n")
+    
+    tests = [SUITES[name] for name in (args.only or SUITES)]
+    
+    results = {}
+    
+    # The suites mostly wait on news feeds, model loading and the database,
+    # so run them side by side; each one's output is printed in one piece,
+    # in the order above, as soon as it and the suites before it finish
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = SuiteOutput(stdout), SuiteOutput(stderr)
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [executor.submit(run_suite, test_name, test_func) for test_name, test_func in tests]
+            for (test_name, _), future in zip(tests, futures):
+                results[test_name], log = future.result()
+                print(log, end='')
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
     
     # Summary
     print("\n" + "="*60)